@@ -0,0 +1,98 @@
+"""
+Cold start: time to the password screen and time to Marvin's first reply.
+
+Each sample is a fresh interpreter, as a newly started worker would be. It
+runs the app headless with Streamlit's AppTest and an SDK stub that answers
+at once, then:
+
+    opens the app              -> time_to_password_screen
+    enters the password        (this rerun imports the SDK and feature modules)
+    sends the first message    -> time_to_first_reply
+
+Both numbers are the app's own startup metrics (see profiler.py), so the
+first reply is timed from the first rerun past the gate and includes the
+imports deferred there. The SDK import itself is not in it: the stub stands
+in for it. The app runs from a temporary copy of ui/ and coaches/, so the
+token ledger and card registry it writes go to that copy's data/.
+
+    python benchmarks/cold_start.py [samples]
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = r"""
+import json, sys, types
+
+sys.path.insert(0, sys.argv[1])
+from streamlit.testing.v1 import AppTest
+
+REPLY = 'Good start. Who are your best customers?\n\n<STATE_JSON>\n{"current_phase": "objective"}\n</STATE_JSON>'
+
+
+class StubAnthropic:
+    def __init__(self, **kwargs):
+        self.messages = self
+
+    def create(self, **kwargs):
+        return types.SimpleNamespace(
+            content=[types.SimpleNamespace(text=REPLY)],
+            usage=types.SimpleNamespace(input_tokens=100, output_tokens=50),
+        )
+
+
+sys.modules["anthropic"] = types.SimpleNamespace(Anthropic=StubAnthropic)
+
+at = AppTest.from_file(sys.argv[2], default_timeout=60)
+at.secrets["APP_PASSWORD"] = "benchmark"
+at.secrets["ANTHROPIC_API_KEY"] = "unused"
+at.run()
+at.text_input[0].input("benchmark")
+next(b for b in at.button if b.label == "Continue").click().run()
+at.text_area(key="composer_text").set_value("We clean clinics and serviced offices.")
+next(b for b in at.button if b.label == "Send").click().run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+
+from profiler import startup_metrics
+
+print(json.dumps({name: m["first_ms"] for name, m in startup_metrics.snapshot().items()}))
+"""
+
+
+def app_copy(workdir: str) -> str:
+    # Laid out like the repo: the script finds its prompt at ../coaches
+    ignore = shutil.ignore_patterns("__pycache__")
+    shutil.copytree(os.path.join(ROOT, "ui"), os.path.join(workdir, "ui"), ignore=ignore)
+    shutil.copytree(os.path.join(ROOT, "coaches"), os.path.join(workdir, "coaches"), ignore=ignore)
+    return os.path.join(workdir, "ui")
+
+
+def sample(ui_dir: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", SAMPLE, ui_dir, os.path.join(ui_dir, "coach_bot_ui.py")],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(samples: int = 5) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        ui_dir = app_copy(workdir)
+        sample(ui_dir)  # compile the copy once, so every timed sample starts from bytecode
+        results = [sample(ui_dir) for _ in range(samples)]
+
+    print(f"{samples} fresh interpreters, SDK stubbed (milliseconds)")
+    for name in ("time_to_password_screen", "time_to_first_reply"):
+        values = [r[name] for r in results]
+        print(f"{name:<24} median {statistics.median(values):7.1f}   min {min(values):7.1f}   max {max(values):7.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,91 @@
+"""
+Digest cost and size for a 50KB business-plan paste.
+
+Builds a synthetic plan of about 50,000 characters (headings, long
+paragraphs, bullet lists), times build_digest over several runs, then
+plays the turns after the paste and prints the input each model call would
+carry (the same messages call_model builds from chat), with and without
+the digest, and the size of the chat the session store would keep.
+
+    python benchmarks/ingest_50kb.py [chars] [runs] [turns]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ui"))
+
+from ingest import build_digest  # noqa: E402
+
+SECTION = """Industry: Commercial cleaning
+
+We are a commercial cleaning business serving offices and clinics in the north west. Today we have 38 employees and two vans per site team. Revenue last year was $2.4m at a 14% margin, with 120 active clients.
+
+Our best customers are facility managers who need jobs done first time. Most competitors compete on price and lose clients within a year; our retention is 91%. We plan to reach 60 staff by 2027 and open a second depot.
+
+- Pricing: fixed monthly contracts, reviewed annually
+- Focus: healthcare and serviced offices, not retail
+- Risk: two clients make up 30% of turnover
+"""
+
+
+def build_plan(chars: int) -> str:
+    parts, n = [], 0
+    while n < chars:
+        part = f"## Section {len(parts) + 1}\n\n{SECTION}"
+        parts.append(part)
+        n += len(part)
+    return "\n\n".join(parts)[:chars]
+
+
+REPLY = "Useful. Which of those customers would you least like to lose, and why? " * 3
+ANSWER = "Facility managers at clinics, because they renew every year and refer us on. " * 2
+
+
+def model_input_chars(chat: list) -> int:
+    # What call_model sends: role and content of every user/assistant message
+    return sum(len(m["content"]) for m in chat if m["role"] in ("user", "assistant"))
+
+
+def play_turns(plan: str, turns: int, digest=None) -> None:
+    chat = [{"role": "assistant", "content": "Before we dive in — three quick things."}]
+    if digest is None:
+        chat.append({"role": "user", "content": plan})
+        first = model_input_chars(chat)
+    else:
+        chat.append({"role": "user", "content": digest.text, "preview": digest.preview})
+        # The paste turn alone sends the full text in place of the digest
+        first = model_input_chars(chat[:-1]) + len(plan)
+    sizes = [first]
+    for _ in range(turns):
+        chat.append({"role": "assistant", "content": REPLY})
+        chat.append({"role": "user", "content": ANSWER})
+        sizes.append(model_input_chars(chat))
+    label = "with digest   " if digest else "paste kept    "
+    print(f"{label} input chars per turn: " + ", ".join(f"{n:,}" for n in sizes))
+    print(f"{' ' * len(label)} stored chat after {turns} turns: {len(json.dumps(chat)):,} bytes")
+
+
+def main(chars: int = 50_000, runs: int = 20, turns: int = 6) -> None:
+    plan = build_plan(chars)
+    build_digest(plan)  # warm the regex caches
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        digest = build_digest(plan)
+        times.append(time.perf_counter() - started)
+
+    print(f"paste:  {digest.chars_in:,} chars in {digest.chunks} chunks")
+    print(f"digest: {len(digest.text):,} chars, {len(digest.facts)} key points, orientation {digest.orientation}")
+    print(f"build_digest over {runs} runs: median {statistics.median(times) * 1000:.1f} ms, "
+          f"max {max(times) * 1000:.1f} ms")
+    print()
+    play_turns(plan, turns)
+    play_turns(plan, turns, digest)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
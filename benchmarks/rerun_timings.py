@@ -0,0 +1,137 @@
+"""
+Cost of a quick-action click on a long session: before and after fragments.
+
+Runs the app headless with Streamlit's AppTest, loads a 60-turn transcript
+and clicks "Revise scope" repeatedly, timing the script execution each click
+causes (AppTest's own bookkeeping is left out):
+
+    before  the last script without fragments (BASELINE_REV): the sidebar
+            button sets the text and calls st.rerun(), so one click runs the
+            whole page twice
+    after   the current script: the button sits in the composer fragment and
+            only that fragment reruns
+
+AppTest reruns the whole script on every click, so for "after" the click's
+rerun carries the composer fragment's id, as the browser's does.
+
+    python benchmarks/rerun_timings.py [turns] [runs] [baseline-rev]
+"""
+import functools
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ui"))
+
+from streamlit.runtime.scriptrunner import script_runner  # noqa: E402
+from streamlit.testing.v1 import AppTest, local_script_runner  # noqa: E402
+
+# Parent of the commit that split the page into fragments
+BASELINE_REV = "1315538"
+
+
+def long_chat(turns: int) -> list:
+    chat = [{"role": "assistant", "content": "Before we dive in — three quick things."}]
+    for i in range(turns):
+        chat.append({"role": "user", "content": f"Turn {i}: our best customers are facility managers who need jobs done first time. " * 3})
+        chat.append({"role": "assistant", "content": f"Turn {i}: useful. Which of those customers would you least like to lose, and why? " * 4})
+    return chat
+
+
+@contextmanager
+def timed_script_runs(durations: list):
+    """Record how long each script (or fragment) execution takes."""
+    original = script_runner.exec_func_with_error_handling
+
+    def timed(func, ctx):
+        started = time.perf_counter()
+        try:
+            return original(func, ctx)
+        finally:
+            durations.append(time.perf_counter() - started)
+
+    script_runner.exec_func_with_error_handling = timed
+    try:
+        yield
+    finally:
+        script_runner.exec_func_with_error_handling = original
+
+
+@contextmanager
+def fragment_rerun(fragment_id: str):
+    """Make AppTest's reruns run one fragment, the way a click inside it does in the browser."""
+    original = local_script_runner.RerunData
+    local_script_runner.RerunData = functools.partial(original, fragment_id_queue=[fragment_id])
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = original
+
+
+def start_app(script: str, turns: int) -> AppTest:
+    at = AppTest.from_file(script, default_timeout=60)
+    at.secrets["APP_PASSWORD"] = "benchmark"
+    at.secrets["ANTHROPIC_API_KEY"] = "unused"
+    at.session_state["authed"] = True
+    at.run()
+    at.session_state["chat"] = long_chat(turns)
+    at.session_state["has_started"] = True
+    at.run()  # warm the transcript cache
+    if at.exception:
+        raise SystemExit(at.exception[0].value)
+    return at
+
+
+def time_clicks(at: AppTest, find_button, runs: int):
+    per_click, runs_per_click = [], []
+    for _ in range(runs):
+        durations = []
+        with timed_script_runs(durations):
+            find_button(at).click().run()
+        if at.exception:
+            raise SystemExit(at.exception[0].value)
+        assert at.session_state["composer_text"] == "Revise scope: "
+        per_click.append(sum(durations) * 1000)
+        runs_per_click.append(len(durations))
+    return statistics.median(per_click), statistics.median(runs_per_click)
+
+
+def baseline_script(rev: str, workdir: str) -> str:
+    # Laid out like the repo: the old script finds its prompt at ../coaches
+    os.makedirs(os.path.join(workdir, "ui"))
+    shutil.copytree(os.path.join(ROOT, "coaches"), os.path.join(workdir, "coaches"))
+    source = subprocess.run(
+        ["git", "show", f"{rev}:ui/coach_bot_ui.py"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    path = os.path.join(workdir, "ui", "coach_bot_ui.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    return path
+
+
+def main(turns: int = 60, runs: int = 20, baseline_rev: str = BASELINE_REV) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        at = start_app(baseline_script(baseline_rev, workdir), turns)
+        before, before_runs = time_clicks(at, lambda at: next(b for b in at.button if b.label == "Revise scope"), runs)
+
+    at = start_app(os.path.join(ROOT, "ui", "coach_bot_ui.py"), turns)
+    # The composer is the last fragment the page registers while the session is open
+    registered = at._fragment_storage._registration_sequence_by_id
+    composer_id = max(registered, key=registered.get)
+    with fragment_rerun(composer_id):
+        after, after_runs = time_clicks(at, lambda at: at.button(key="revise_scope"), runs)
+
+    print(f"{2 * turns + 1} messages, {runs} clicks on 'Revise scope' (script time per click)")
+    print(f"before ({baseline_rev}, sidebar + st.rerun)  median {before:6.1f} ms over {before_runs:g} script runs")
+    print(f"after (composer fragment)         median {after:6.1f} ms over {after_runs:g} fragment run")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    main(*[int(a) for a in args[:2]], *args[2:])
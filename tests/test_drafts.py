@@ -0,0 +1,45 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from drafts import MAX_DRAFTS, draft_basis, generate_drafts, pick_emphases
+
+def test_emphases_never_repeat():
+    assert pick_emphases(9) == pick_emphases(MAX_DRAFTS)
+    assert len(set(pick_emphases(9))) == MAX_DRAFTS
+    assert pick_emphases(0) == ["objective"]
+
+
+def test_concurrent_requests_do_not_serialise():
+    # Every call of every request must be in flight at once to get past the barrier;
+    # if the calls were serialised anywhere, the barrier would time out and they would fail
+    requests = 3
+    barrier = threading.Barrier(requests * MAX_DRAFTS, timeout=10)
+
+    def send(system, messages):
+        barrier.wait()
+        return "Draft: a draft\n\nRefined: a refined draft"
+
+    with ThreadPoolExecutor(requests) as pool:
+        results = list(pool.map(lambda _: generate_drafts(send, "system", {}, n=MAX_DRAFTS), range(requests)))
+    assert all(len(candidates) == MAX_DRAFTS and failed == 0 for candidates, failed in results)
+
+
+def test_candidates_carry_the_basis_they_were_built_from():
+    state = {"objective": "Grow to $4m by 2027", "scope": "Clinics", "advantage": "Same-day cover"}
+    candidates, _failed = generate_drafts(lambda system, messages: "Draft: a draft", "system", state, n=2)
+    assert {c["basis"] for c in candidates} == {draft_basis(state)}
+    # Any change to what the drafts were built from makes them stale
+    assert draft_basis({**state, "scope": "Clinics and serviced offices"}) != draft_basis(state)
+    assert draft_basis({**state, "refined_statement": "A newer statement"}) != draft_basis(state)
+    assert draft_basis({**state, "next_question": "Anything else?"}) == draft_basis(state)
+
+
+def test_failed_candidates_are_counted():
+    def send(system, messages):
+        if "Lead with the Scope" in messages[0]["content"]:
+            raise RuntimeError("overloaded")
+        return "Draft: a draft"
+
+    candidates, failed = generate_drafts(send, "system", {}, n=3)
+    assert failed == 1
+    assert [c["emphasis"] for c in candidates] == ["objective", "advantage"]
@@ -0,0 +1,57 @@
+import re
+
+from ingest import CHUNK_CHARS, build_digest, chunk_text, extract_orientation
+
+
+def _sentences(tag: str, n: int) -> str:
+    return " ".join(f"{tag} sentence {i} says our revenue grew 12% with 40 clients." for i in range(n))
+
+
+def test_chunks_keep_document_order():
+    text = "\n\n".join([
+        "Intro paragraph about the business.",
+        _sentences("Long", 80),  # well over CHUNK_CHARS on its own
+        "Closing paragraph about the plan.",
+    ])
+    joined = " ".join(chunk_text(text))
+    positions = [joined.index("Intro"), joined.index("Long sentence 0 "), joined.index("Long sentence 79 "), joined.index("Closing")]
+    assert positions == sorted(positions)
+
+
+def test_oversized_paragraph_splits_on_sentences():
+    chunks = chunk_text(_sentences("Long", 80))
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= CHUNK_CHARS
+        assert chunk.startswith("Long sentence ") and chunk.endswith("clients.")
+
+
+def test_digest_key_points_are_whole_sentences():
+    text = "\n\n".join(["- ", _sentences("Long", 120), "-", "* Our margin is 18% across 300 customers this year."])
+    digest = build_digest(text)
+    assert digest.facts
+    for fact in digest.facts:
+        assert fact.strip(" -*") and not fact.startswith(("-", "*"))
+        assert fact.endswith(".") or fact.endswith("…")
+    assert not re.search(r"^- *$", digest.text, re.MULTILINE)
+
+
+def test_industry_needs_a_first_person_description():
+    assert "industry" not in extract_orientation("The market is a crowded software business with thin margins.")
+    assert extract_orientation("We are a commercial cleaning business in Leeds.")["industry"] == "commercial cleaning"
+    assert extract_orientation("Sector: Facilities management")["industry"] == "Facilities management"
+
+
+def test_team_size_ignores_goals():
+    assert "team_size" not in extract_orientation("We want to reach 500 people by 2026.")
+    assert "team_size" not in extract_orientation("Our goal is 40 staff within 3 years.")
+    text = "We plan to hire 20 engineers next year. Today we have 12 employees across two sites."
+    assert extract_orientation(text)["team_size"] == "12"
+
+
+def test_preview_is_short_and_says_how_much_was_left_out():
+    text = _sentences("Long", 400)
+    digest = build_digest(text)
+    assert len(digest.preview) < 700
+    assert digest.preview.startswith("Long sentence 0 says")
+    assert "more characters, summarised for Marvin" in digest.preview
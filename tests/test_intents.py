@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from intents import (
+    AFFIRM, RESET, REVISE, SET_COMPONENT, SHOW_STATEMENT, UNDO,
+    Intent, asked_commitment, classify_intent,
+)
+
+COMMITMENT_QUESTION = "Are you prepared to back this with resources and focus?"
+
+# (utterance, expected intent or None for "goes to the model")
+LABELLED = [
+    ("yes", Intent(AFFIRM)),
+    ("Yes.", Intent(AFFIRM)),
+    ("yep!", Intent(AFFIRM)),
+    ("absolutely", Intent(AFFIRM)),
+    ("We are", Intent(AFFIRM)),
+    ("ok", Intent(AFFIRM)),
+    ("let's do it", Intent(AFFIRM)),
+    ("reset", Intent(RESET)),
+    ("Start over", Intent(RESET)),
+    ("restart", Intent(RESET)),
+    ("undo", Intent(UNDO)),
+    ("show my statement", Intent(SHOW_STATEMENT)),
+    ("Show me the working strategy", Intent(SHOW_STATEMENT)),
+    ("change scope to facility managers", Intent(SET_COMPONENT, "scope", "facility managers")),
+    ("Set my objective = $4m by FY27", Intent(SET_COMPONENT, "objective", "$4m by FY27")),
+    ("Revise advantage: the only 24/7 backflow crew", Intent(REVISE, "advantage", "the only 24/7 backflow crew")),
+    # "revise" always means a coached revision, whichever way it is phrased
+    ("revise scope to facility managers", Intent(REVISE, "scope", "facility managers")),
+    ("Revise my objective = $4m by FY27", Intent(REVISE, "objective", "$4m by FY27")),
+    ("revise the scope to: clinics only", Intent(REVISE, "scope", "clinics only")),
+    # Negatives: these carry content or doubt and must reach the model
+    ("yes but I'm not sure about the timeframe", None),
+    ("yes, although the margin target worries me", None),
+    ("restart the scope discussion?", None),
+    ("can we undo the last change to scope and talk about it?", None),
+    ("I'd rather not reset anything yet", None),
+    ("ok so what does scope actually mean?", None),
+    ("show me an example of a good advantage", None),
+    ("Revise scope: ", None),
+    ("We're a plumbing business with 4 staff.", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("text,expected", LABELLED)
+def test_classify_intent_labelled(text, expected):
+    assert classify_intent(text) == expected
+
+
+def test_classify_intent_accuracy():
+    correct = sum(classify_intent(text) == expected for text, expected in LABELLED)
+    assert correct == len(LABELLED)
+
+
+def test_classify_intent_latency():
+    texts = [text for text, _ in LABELLED] * 200
+    start = time.perf_counter()
+    for text in texts:
+        classify_intent(text)
+    per_message = (time.perf_counter() - start) / len(texts)
+    print(f"classify_intent: {per_message * 1e6:.2f} µs/message over {len(texts)} messages")
+    # Generous bound: it runs on every message, so it must stay far below a model round trip
+    assert per_message < 200e-6
+
+
+def test_asked_commitment_requires_explicit_question():
+    assert asked_commitment({"current_phase": "commit", "next_question": COMMITMENT_QUESTION}, COMMITMENT_QUESTION)
+    assert not asked_commitment({"current_phase": "commit", "next_question": ""}, COMMITMENT_QUESTION)
+    assert not asked_commitment(
+        {"current_phase": "commit", "next_question": "What's making you pause?"}, COMMITMENT_QUESTION
+    )
+    assert not asked_commitment(
+        {"current_phase": "strategy_statement", "next_question": COMMITMENT_QUESTION}, COMMITMENT_QUESTION
+    )
+    assert not asked_commitment(None, COMMITMENT_QUESTION)
+
+
+def test_asked_commitment_reads_the_explicit_flag():
+    assert asked_commitment({"current_phase": "commit", "awaiting_commitment": True, "next_question": ""}, COMMITMENT_QUESTION)
+    assert not asked_commitment(
+        {"current_phase": "commit", "awaiting_commitment": False, "next_question": "What's making you pause?"},
+        COMMITMENT_QUESTION,
+    )
+    assert not asked_commitment({"current_phase": "scope", "awaiting_commitment": True}, COMMITMENT_QUESTION)
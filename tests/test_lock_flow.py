@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+
+streamlit_testing = pytest.importorskip("streamlit.testing.v1")
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui", "coach_bot_ui.py")
+
+STATE = {
+    "business_type": "b2b",
+    "industry": "commercial cleaning",
+    "team_size": "38",
+    "objective": "Grow revenue to $4m by 2027",
+    "scope": "Healthcare clinics and serviced offices in the north west",
+    "advantage": "Clinical-grade cleaning with same-day cover",
+    "strategic_assumptions": ["Clinics keep outsourcing cleaning"],
+    "current_phase": "commit",
+    "draft_statement": "We will grow to $4m by 2027 by serving clinics and serviced offices.",
+    "refined_statement": "Clinics and serviced offices in the north west, cleaned to clinical standard.",
+}
+
+
+def reply(text: str, **state) -> str:
+    return f"{text}\n\n<STATE_JSON>\n{json.dumps({**STATE, **state})}\n</STATE_JSON>"
+
+
+class FakeAnthropic:
+    """Stands in for the SDK: hands back queued replies in order."""
+
+    replies = []
+    calls = []
+
+    def __init__(self, **kwargs):
+        self.messages = self
+
+    def create(self, **kwargs):
+        FakeAnthropic.calls.append(kwargs)
+        text = FakeAnthropic.replies.pop(0)
+        return types.SimpleNamespace(
+            content=[types.SimpleNamespace(text=text)],
+            usage=types.SimpleNamespace(input_tokens=100, output_tokens=50),
+        )
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    import strategy_card
+    import token_ledger
+
+    monkeypatch.setitem(sys.modules, "anthropic", types.SimpleNamespace(Anthropic=FakeAnthropic))
+    monkeypatch.setattr(token_ledger, "DEFAULT_LEDGER_PATH", str(tmp_path / "ledger.sqlite3"))
+    monkeypatch.setattr(strategy_card, "DEFAULT_REGISTRY_PATH", str(tmp_path / "cards.sqlite3"))
+    FakeAnthropic.replies = []
+    FakeAnthropic.calls = []
+    at = streamlit_testing.AppTest.from_file(APP, default_timeout=30)
+    at.secrets["APP_PASSWORD"] = "test"
+    at.secrets["ANTHROPIC_API_KEY"] = "test"
+    at.session_state["authed"] = True
+    at.run()
+    return at
+
+
+def send(at, text: str) -> None:
+    at.text_area(key="composer_text").set_value(text)
+    next(b for b in at.button if b.label == "Send").click()
+    at.run()
+    assert not at.exception
+
+
+def test_reworded_commitment_question_still_locks(app):
+    # The model paraphrases the question and leaves next_question empty; the flag carries it
+    FakeAnthropic.replies.append(
+        reply("That reads well. So, are you ready to put resources and focus behind it?",
+              next_question="", awaiting_commitment=True)
+    )
+    send(app, "Yes, the refined version captures it.")
+    assert app.session_state["assistant_asked_commitment"]
+
+    send(app, "yes")
+    assert app.session_state["is_locked"]
+    assert FakeAnthropic.replies == []
+
+
+def test_hesitation_does_not_lock(app):
+    FakeAnthropic.replies += [
+        reply("Are you prepared to back this with resources and focus?",
+              next_question="Are you prepared to back this with resources and focus?", awaiting_commitment=True),
+        reply("What's making you pause?", next_question="", awaiting_commitment=False),
+        reply("Fair. Which part feels hardest to fund?", next_question="Which part feels hardest to fund?"),
+    ]
+    send(app, "That captures it.")
+    assert app.session_state["assistant_asked_commitment"]
+    send(app, "I'm not sure we can afford it")
+    assert not app.session_state["assistant_asked_commitment"]
+
+    send(app, "ok")
+    assert not app.session_state["is_locked"]
+
+
+def test_stale_draft_candidates_are_hidden(app):
+    from drafts import draft_basis
+
+    state = {**STATE, "current_phase": "strategy_statement", "next_question": "", "awaiting_commitment": False}
+    app.session_state["strategy_state"] = state
+    app.session_state["has_started"] = True
+    app.session_state["draft_candidates"] = [
+        {"emphasis": "scope", "basis": draft_basis(state), "draft": "Scope-led draft", "refined": ""}
+    ]
+    app.run()
+    assert [b.label for b in app.button if b.label == "Use this one"] == ["Use this one"]
+
+    # A later turn changes the scope: the candidate no longer matches and is dropped
+    app.session_state["strategy_state"] = {**state, "scope": "Serviced offices only"}
+    app.run()
+    assert not [b for b in app.button if b.label == "Use this one"]
+    assert app.session_state["draft_candidates"] == []
+
+
+def test_economy_budget_switches_every_call_to_the_smaller_model(app):
+    import token_ledger
+
+    app.secrets["SESSION_TOKEN_CAP"] = "1000"
+    app.secrets["ANTHROPIC_ECONOMY_MODEL"] = "economy-model"
+    # 75% of the cap already spent: the economy stage
+    token_ledger.get_ledger().record(app.session_state["session_id"], "default", "primary", 700, 50)
+    FakeAnthropic.replies += [
+        reply("Noted.", current_phase="scope", next_question=""),
+        reply("Updated.", current_phase="scope", next_question=""),
+    ]
+    send(app, "Our best customers are clinics that need same-day cover.")
+    send(app, "Revise scope: clinics only, no offices")
+    assert [call["model"] for call in FakeAnthropic.calls] == ["economy-model", "economy-model"]
+
+
+def test_large_paste_is_sent_once_and_not_kept(app):
+    paste = "\n\n".join(
+        f"Section {i}. We are a commercial cleaning business with 38 employees. "
+        "Revenue last year was $2.4m at a 14% margin across 120 clients. " * 6
+        for i in range(100)
+    )
+    assert len(paste) > 50_000
+    FakeAnthropic.replies += [
+        reply("Thanks, that's a lot of useful detail.", current_phase="objective", next_question=""),
+        reply("Good. What number would tell you it worked?", current_phase="objective", next_question=""),
+    ]
+    send(app, paste)
+    send(app, "We want to double revenue.")
+
+    paste_turn, next_turn = FakeAnthropic.calls
+    # The paste turn reads the whole document; the next turn only its digest
+    assert paste_turn["messages"][-1]["content"] == paste.strip()
+    assert sum(len(m["content"]) for m in next_turn["messages"]) < 4_000
+
+    # Neither the chat nor the session store keeps the paste
+    stored = json.dumps(app.session_state["chat"])
+    assert len(stored) < 5_000
+    entry = next(m for m in app.session_state["chat"] if "preview" in m)
+    assert entry["preview"].startswith("Section 0.")
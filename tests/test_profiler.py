@@ -0,0 +1,27 @@
+import json
+
+from profiler import Profiler, chrome_trace_json
+
+
+def test_marks_are_exported_as_instant_events():
+    profiler = Profiler(enabled=True)
+    profiler.begin()
+    with profiler.span("transcript"):
+        profiler.mark("time_to_first_reply")
+    profiler.end()
+
+    trace = profiler.completed()[-1]
+    events = json.loads(chrome_trace_json(trace))["traceEvents"]
+    marks = [e for e in events if e["ph"] == "i"]
+    assert [m["name"] for m in marks] == ["time_to_first_reply"]
+    span = next(e for e in events if e["name"] == "transcript")
+    assert span["ts"] <= marks[0]["ts"] <= span["ts"] + span["dur"]
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    profiler.begin()
+    with profiler.span("css"):
+        profiler.mark("time_to_password_screen")
+    profiler.end()
+    assert profiler.completed() == []
@@ -0,0 +1,55 @@
+import os
+import tracemalloc
+
+import prompts
+from prompts import current_prompt_version, prompt_label, resolve_prompt
+
+SESSIONS = 500
+MAX_BYTES_PER_SESSION = 2048
+
+
+def _new_session() -> dict:
+    # What a session holds after the user-030 change: a version key, not the prompt text
+    version = current_prompt_version()
+    return {
+        "prompt_version": version,
+        "chat": [{"role": "assistant", "content": "Before we dive in — three quick things."}],
+    }
+
+
+def test_sessions_share_one_prompt_copy():
+    current_prompt_version()  # register the prompt before measuring
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        sessions = [_new_session() for _ in range(SESSIONS)]
+        resolved = [resolve_prompt(s["prompt_version"]) for s in sessions]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    per_session = grown / SESSIONS
+    print(f"{per_session:.0f} bytes per session")
+    assert per_session < MAX_BYTES_PER_SESSION
+    assert len(resolved[0]) > MAX_BYTES_PER_SESSION  # the prompt itself is far bigger than the budget
+    assert all(text is resolved[0] for text in resolved)
+
+
+def test_edited_prompt_gets_a_new_version(tmp_path, monkeypatch):
+    path = tmp_path / "system_prompt.txt"
+    path.write_text("VERSION V1.0 — test\nBe brief.", encoding="utf-8")
+    monkeypatch.setattr(prompts, "PROMPT_PATH", str(path))
+    monkeypatch.setattr(prompts, "_loaded", None)
+
+    first = current_prompt_version()
+    assert prompt_label(first) == "V1.0"
+    assert current_prompt_version() is first
+
+    path.write_text("VERSION V1.0 — test\nBe briefer.", encoding="utf-8")
+    os.utime(path, (os.path.getmtime(path) + 5, os.path.getmtime(path) + 5))
+    second = current_prompt_version()
+    assert second != first
+    # Running sessions keep the text they started with
+    assert resolve_prompt(first).endswith("Be brief.")
+    assert resolve_prompt(second).endswith("Be briefer.")
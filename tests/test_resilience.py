@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, TailLatencyPolicy, is_retryable
+
+
+class StubError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class StubModel:
+    """Local stand-in for the API: per-model delays and errors, and a call log."""
+
+    def __init__(self, delays=None, errors=None):
+        self.delays = delays or {}
+        self.errors = errors or {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, model):
+        with self._lock:
+            self.calls.append(model)
+        time.sleep(self.delays.get(model, 0.0))
+        if model in self.errors:
+            raise self.errors[model]
+        return f"reply from {model}"
+
+
+def test_fast_primary_is_not_hedged():
+    stub = StubModel()
+    policy = TailLatencyPolicy()
+    assert policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0) == "reply from primary"
+    assert stub.calls == ["primary"]
+    assert policy.metrics.snapshot()["hedges_fired"] == 0
+
+
+def test_hedge_wins_against_slow_primary():
+    stub = StubModel(delays={"primary": 0.5, "fallback": 0.01})
+    policy = TailLatencyPolicy()
+    started = time.monotonic()
+    result = policy.call(stub, primary="primary", fallback="fallback", hedge_to_fallback=True, hedge_after=0.05)
+    assert result == "reply from fallback"
+    assert time.monotonic() - started < 0.4
+    snapshot = policy.metrics.snapshot()
+    assert snapshot["hedges_fired"] == 1
+    assert snapshot["hedge_wins"] == 1
+
+
+def test_hedge_delay_excludes_time_queued():
+    # Fill the model-call pool so the primary waits for a worker longer than the hedge delay
+    blockers = [resilience._executor.submit(time.sleep, 0.2) for _ in range(resilience._executor._max_workers)]
+    stub = StubModel(delays={"primary": 0.05})
+    policy = TailLatencyPolicy()
+    assert policy.call(stub, primary="primary", hedge_after=0.1) == "reply from primary"
+    assert stub.calls == ["primary"]
+    assert policy.metrics.snapshot()["hedges_fired"] == 0
+    for fut in blockers:
+        fut.result()
+
+
+def test_hedges_in_flight_are_capped():
+    stub = StubModel(delays={"primary": 0.3})
+    policy = TailLatencyPolicy(max_hedges_in_flight=1)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(policy.call(stub, primary="primary", hedge_after=0.05)))
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    snapshot = policy.metrics.snapshot()
+    assert results == ["reply from primary"] * 3
+    assert snapshot["hedges_fired"] == 1
+    assert snapshot["hedges_skipped"] == 2
+
+
+def test_fails_over_when_primary_errors():
+    stub = StubModel(errors={"primary": StubError(529)})
+    policy = TailLatencyPolicy()
+    assert policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0) == "reply from fallback"
+    assert stub.calls == ["primary", "fallback"]
+    assert policy.metrics.snapshot()["failovers"] == 1
+
+
+def test_fails_over_when_primary_and_its_hedge_both_error():
+    stub = StubModel(delays={"primary": 0.1}, errors={"primary": StubError(503)})
+    policy = TailLatencyPolicy()
+    result = policy.call(stub, primary="primary", fallback="fallback", hedge_after=0.02)
+    assert result == "reply from fallback"
+    assert stub.calls.count("primary") == 2
+    assert stub.calls[-1] == "fallback"
+
+
+def test_non_retryable_error_passes_through():
+    stub = StubModel(errors={"primary": StubError(400)})
+    policy = TailLatencyPolicy()
+    with pytest.raises(StubError) as info:
+        policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0)
+    assert info.value.status_code == 400
+    assert stub.calls == ["primary"]
+    assert not policy.breaker.is_open
+    assert policy.metrics.snapshot()["failovers"] == 0
+
+
+def test_breaker_opens_then_half_opens():
+    stub = StubModel(errors={"primary": StubError(529)})
+    policy = TailLatencyPolicy(breaker=CircuitBreaker(failure_threshold=2, reset_after=0.1))
+    for _ in range(2):
+        policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0)
+    assert policy.breaker.is_open
+
+    # Open: straight to the fallback, the primary isn't tried
+    stub.calls.clear()
+    assert policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0) == "reply from fallback"
+    assert stub.calls == ["fallback"]
+    assert policy.metrics.snapshot()["breaker_routed"] == 1
+
+    # Half-open after the cool-down: one probe of the primary, and a success closes the breaker
+    time.sleep(0.12)
+    del stub.errors["primary"]
+    stub.calls.clear()
+    assert policy.call(stub, primary="primary", fallback="fallback", hedge_after=1.0) == "reply from primary"
+    assert stub.calls == ["primary"]
+    assert not policy.breaker.is_open
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_after=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open
+    time.sleep(0.06)
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+
+
+def test_is_retryable():
+    assert is_retryable(StubError(429))
+    assert is_retryable(StubError(529))
+    assert is_retryable(ConnectionError())
+    assert not is_retryable(StubError(400))
+    assert not is_retryable(StubError(401))
@@ -0,0 +1,88 @@
+from revisions import EXCHANGE_CHARS, build_revision_request, last_exchange, merge_revision
+
+PHASES = ["orientation", "objective", "scope", "advantage", "strategy_statement", "commit"]
+
+CURRENT = {
+    "business_type": "b2b",
+    "industry": "commercial cleaning",
+    "team_size": "38",
+    "objective": "Grow revenue to $4m by 2027",
+    "scope": "Offices and clinics in the north west",
+    "advantage": "Same-day cover",
+    "strategic_assumptions": ["Clinics keep outsourcing"],
+    "current_phase": "strategy_statement",
+    "next_question": "Does the refined version capture it?",
+    "awaiting_commitment": False,
+    "draft_statement": "Old draft",
+    "refined_statement": "Old refined",
+}
+
+
+def chat_of(turns: int) -> list:
+    chat = [{"role": "assistant", "content": "Before we dive in — three quick things."}]
+    for i in range(turns):
+        chat.append({"role": "user", "content": f"Turn {i:04d}: our customers are facility managers. " * 5})
+        chat.append({"role": "assistant", "content": f"Turn {i:04d}: which of them would you least like to lose? " * 5})
+    return chat
+
+
+def test_only_the_revised_component_and_dependents_change():
+    returned = {
+        **CURRENT,
+        "objective": "Something the model made up",
+        "advantage": "Also made up",
+        "industry": "plumbing",
+        "scope": "Clinics only; no offices",
+        "draft_statement": "New draft",
+        "refined_statement": "New refined",
+        "next_question": "Does that still hold?",
+    }
+    merged = merge_revision(CURRENT, returned, "scope", PHASES)
+    assert merged["scope"] == "Clinics only; no offices"
+    assert merged["draft_statement"] == "New draft"
+    assert merged["refined_statement"] == "New refined"
+    assert merged["next_question"] == "Does that still hold?"
+    for key in ("objective", "advantage", "industry", "business_type", "team_size"):
+        assert merged[key] == CURRENT[key]
+
+
+def test_empty_or_missing_values_keep_the_current_ones():
+    merged = merge_revision(CURRENT, {"scope": "  ", "draft_statement": ""}, "scope", PHASES)
+    assert merged["scope"] == CURRENT["scope"]
+    assert merged["draft_statement"] == CURRENT["draft_statement"]
+    assert merge_revision(CURRENT, None, "scope", PHASES) == CURRENT
+
+
+def test_phase_never_moves_backwards():
+    back = merge_revision(CURRENT, {**CURRENT, "current_phase": "scope"}, "scope", PHASES)
+    assert back["current_phase"] == "strategy_statement"
+    forward = merge_revision(CURRENT, {**CURRENT, "current_phase": "commit"}, "scope", PHASES)
+    assert forward["current_phase"] == "commit"
+    unknown = merge_revision(CURRENT, {**CURRENT, "current_phase": "wrap-up"}, "scope", PHASES)
+    assert unknown["current_phase"] == "strategy_statement"
+
+
+def test_revision_clears_a_pending_commitment_question():
+    pending = {**CURRENT, "current_phase": "commit", "awaiting_commitment": True}
+    merged = merge_revision(pending, {"scope": "Clinics only"}, "scope", PHASES)
+    assert not merged["awaiting_commitment"]
+
+
+def test_request_size_does_not_grow_with_the_session():
+    sizes = set()
+    for turns in (2, 20, 200):
+        chat = chat_of(turns) + [{"role": "user", "content": "Revise scope: clinics only"}]
+        request = build_revision_request(CURRENT, "scope", "clinics only", last_exchange(chat[:-1]))
+        sizes.add(len(request))
+    assert len(sizes) == 1
+    # The transcript part is capped at one clipped exchange
+    assert sizes.pop() < 1000 + 2 * EXCHANGE_CHARS
+
+
+def test_last_exchange_is_the_latest_reply_and_its_prompt():
+    chat = chat_of(3)
+    exchange = last_exchange(chat)
+    assert [m["role"] for m in exchange] == ["user", "assistant"]
+    assert exchange[1]["content"].startswith("Turn 0002:")
+    assert last_exchange([{"role": "user", "content": "hi"}]) == []
+    assert [m["role"] for m in last_exchange(chat[:1])] == ["assistant"]
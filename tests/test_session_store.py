@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from session_store import InMemorySessionStore, SessionConflict, SQLiteSessionStore
+
+UI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ui")
+
+# Runs in its own interpreter: a fresh store on the shared file, retrying on conflict like a reloaded worker
+WORKER = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from session_store import SessionConflict, SQLiteSessionStore
+
+path, sid, worker, turns = sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5])
+store = SQLiteSessionStore(path)
+for turn in range(turns):
+    while True:
+        stored = store.load(sid)
+        version, chat = (stored.version, stored.chat) if stored else (0, [])
+        message = {"role": "user", "content": f"worker {worker} turn {turn}"}
+        try:
+            store.save(sid, version, len(chat), [message], {"is_locked": False})
+            break
+        except SessionConflict:
+            continue
+"""
+
+
+def test_sqlite_store_is_shared_by_worker_processes(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    SQLiteSessionStore(path)
+    workers, turns = 4, 10
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER, UI_DIR, path, "sid", str(w), str(turns)])
+        for w in range(workers)
+    ]
+    for p in procs:
+        assert p.wait(60) == 0
+
+    stored = SQLiteSessionStore(path).load("sid")
+    # Every turn landed exactly once: no lost writes, no duplicates
+    assert stored.version == workers * turns
+    assert sorted(m["content"] for m in stored.chat) == sorted(
+        f"worker {w} turn {t}" for w in range(workers) for t in range(turns)
+    )
+
+
+def test_sqlite_stale_save_from_another_worker_conflicts(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    a, b = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    a.save("sid", 0, 0, [{"role": "user", "content": "hi"}], {})
+    seen_by_b = b.load("sid")
+    a.save("sid", 1, 1, [{"role": "assistant", "content": "from a"}], {})
+    with pytest.raises(SessionConflict):
+        b.save("sid", seen_by_b.version, 1, [{"role": "assistant", "content": "from b"}], {})
+    assert [m["content"] for m in b.load("sid").chat] == ["hi", "from a"]
+    with pytest.raises(SessionConflict):
+        b.save("sid", 0, 0, [], {})
+
+
+def test_sqlite_purges_expired_sessions(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), ttl=60)
+    store.save("old", 0, 0, [{"role": "user", "content": "hi"}], {})
+    store.save("new", 0, 0, [{"role": "user", "content": "hi"}], {})
+    assert store.purge_expired(now=time.time() + 30) == 0
+    with store._connect() as conn:
+        conn.execute("UPDATE sessions SET updated = updated - 120 WHERE sid = 'old'")
+    assert store.load("old") is None
+    assert store.purge_expired() == 1
+    with store._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM messages WHERE sid = 'old'").fetchone()[0] == 0
+    assert store.load("new").version == 1
+    # An expired sid starts over rather than conflicting with its old row
+    assert store.save("old", 0, 0, [], {}) == 1
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2)
+    store.save("a", 0, 0, [], {})
+    store.save("b", 0, 0, [], {})
+    store.load("a")
+    store.save("c", 0, 0, [], {})
+    assert store.load("b") is None
+    assert store.load("a") is not None and store.load("c") is not None
+
+
+def test_memory_store_expires_sessions():
+    store = InMemorySessionStore(ttl=0.05)
+    store.save("a", 0, 0, [], {})
+    assert store.load("a") is not None
+    time.sleep(0.1)
+    assert store.load("a") is None
+    assert store.save("a", 0, 0, [], {}) == 1
@@ -0,0 +1,99 @@
+import pytest
+
+from state_history import MAIN_BRANCH, StateHistory
+
+
+def _state(**fields):
+    base = {"objective": "", "scope": "", "advantage": "", "strategic_assumptions": []}
+    base.update(fields)
+    return base
+
+
+def test_undo_back_to_root():
+    history = StateHistory(_state())
+    history.record(_state(objective="Grow to $4m by 2027"))
+    history.record(_state(objective="Grow to $4m by 2027", scope="Clinics in Leeds"))
+    assert history.undo()["scope"] == ""
+    assert history.undo() == _state()
+    assert not history.can_undo()
+    assert history.undo() is None
+    assert history.current() == _state()
+
+
+def test_record_without_changes_is_a_no_op():
+    history = StateHistory(_state())
+    assert not history.record(_state())
+    assert len(history) == 1
+
+
+def test_lists_round_trip_as_lists():
+    history = StateHistory(_state())
+    history.record(_state(strategic_assumptions=["Clinics keep outsourcing"]))
+    current = history.current()
+    assert current["strategic_assumptions"] == ["Clinics keep outsourcing"]
+    assert isinstance(current["strategic_assumptions"], list)
+    # Mutating what was handed out doesn't change the snapshot
+    current["strategic_assumptions"].append("extra")
+    assert history.current()["strategic_assumptions"] == ["Clinics keep outsourcing"]
+    # An equal list is not a change
+    assert not history.record(_state(strategic_assumptions=["Clinics keep outsourcing"]))
+
+
+def test_prune_keeps_ancestors_another_branch_still_holds():
+    history = StateHistory(_state(), max_depth=3)
+    history.record(_state(objective="a"))
+    history.record(_state(objective="b"))
+    history.branch("alt")
+    history.checkout(MAIN_BRANCH)
+    for i in range(10):
+        history.record(_state(objective=f"main {i}"))
+
+    # Main keeps only its last three snapshots
+    assert len(history._window) == 3
+    history.undo()
+    history.undo()
+    assert not history.can_undo()
+    assert history.current()["objective"] == "main 7"
+
+    # The alt branch still has the ancestors it shares with main
+    assert history.checkout("alt")["objective"] == "b"
+    assert history.undo()["objective"] == "a"
+    assert history.undo() == _state()
+
+    # Nothing outside the two windows is retained
+    assert len(history) == len({n.id for w in history._windows.values() for n in w})
+
+
+def test_memory_is_bounded_by_depth_and_branches():
+    history = StateHistory(_state(), max_depth=5, max_branches=3)
+    for i in range(200):
+        history.record(_state(objective=f"v{i}"))
+    history.branch("one")
+    history.branch("two")
+    for i in range(200):
+        history.record(_state(objective=f"w{i}"))
+    assert len(history) <= 5 * 3
+    with pytest.raises(ValueError):
+        history.branch("three")
+
+
+def test_checkout_switches_branch_state():
+    history = StateHistory(_state())
+    history.record(_state(advantage="Same-day response"))
+    history.branch("premium")
+    history.record(_state(advantage="Clinical-grade cleaning"))
+    assert history.checkout(MAIN_BRANCH)["advantage"] == "Same-day response"
+    assert history.checkout("premium")["advantage"] == "Clinical-grade cleaning"
+    assert history.branch_name == "premium"
+    with pytest.raises(KeyError):
+        history.checkout("missing")
+
+
+def test_duplicate_or_empty_branch_name_is_rejected():
+    history = StateHistory(_state())
+    history.branch("alt")
+    with pytest.raises(ValueError):
+        history.branch("alt")
+    with pytest.raises(ValueError):
+        history.branch("  ")
+    assert history.branches() == [MAIN_BRANCH, "alt"]
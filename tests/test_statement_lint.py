@@ -0,0 +1,39 @@
+import pytest
+
+from statement_lint import lint_message, lint_statement, looks_like_component, score_statement
+
+
+@pytest.mark.parametrize("phase", ["objective", "scope", "advantage", "strategy_statement"])
+@pytest.mark.parametrize("reply", [
+    "yes",
+    "what do you mean?",
+    "that captures it",
+    "Yes, I think that's right, go with it",
+    "ok",
+    "Can you give me an example of a good one?",
+])
+def test_conversational_replies_are_not_linted(reply, phase):
+    assert lint_message(reply, phase) == []
+
+
+def test_objective_reply_is_linted():
+    codes = {f.code for f in lint_message("We want to grow revenue a lot", "objective")}
+    assert codes == {"NO_TARGET", "NO_TIMEFRAME"}
+    assert lint_message("Grow revenue to $4m by FY2027", "objective") == []
+
+
+def test_objective_needs_an_objective_signal():
+    assert not looks_like_component("I run the business with my brother", "objective")
+    assert looks_like_component("Double profit over the next two years", "objective")
+
+
+def test_efficiency_advantage_reply_is_linted():
+    findings = lint_message("We give better service and faster turnaround", "advantage")
+    assert [f.code for f in findings] == ["EFFICIENCY_ADVANTAGE"]
+
+
+def test_statement_findings_talk_about_the_statement():
+    findings = lint_statement("To grow by offering better service to local homeowners through our vans.")
+    assert {f.component for f in findings} == {"statement"}
+    assert not any(f.message.startswith("Objective") for f in findings)
+    assert score_statement("To grow to $4m by FY2027 by being the only certified backflow crew for hospitals.") == 1.0
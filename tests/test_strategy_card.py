@@ -0,0 +1,111 @@
+import io
+import re
+import uuid
+import zipfile
+
+import pytest
+
+import strategy_card
+from strategy_card import CardRegistry, build_cohort_archive, card_hash, render_pdf, render_png, request_card
+
+
+def fields(statement=None):
+    # Unique content per test: rendered cards are cached process-wide by hash
+    return {
+        "statement": statement or f"Clinics in Leeds, cleaned to clinical standard ({uuid.uuid4().hex[:6]}).",
+        "draft": "We will grow to $4m by 2027 by serving clinics and serviced offices in the north west.",
+        "assumptions": ["Clinics keep outsourcing cleaning", "Same-day cover stays rare"],
+        "business_type": "B2B",
+        "industry": "commercial cleaning",
+        "team_size": "38",
+    }
+
+
+@pytest.fixture
+def registry_path(monkeypatch, tmp_path):
+    path = str(tmp_path / "cards.sqlite3")
+    monkeypatch.setattr(strategy_card, "DEFAULT_REGISTRY_PATH", path)
+    return path
+
+
+def test_pdf_has_a_valid_xref_table():
+    pdf = render_pdf(fields("Café owners first — “quoted” text (with brackets) survives."))
+    assert pdf.startswith(b"%PDF-1.4\n")
+    assert pdf.rstrip().endswith(b"%%EOF")
+
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n")
+    header = re.match(rb"xref\n0 (\d+)\n", pdf[startxref:])
+    count = int(header.group(1))
+    entries = pdf[startxref + header.end():].split(b"\n")[:count]
+    assert entries[0] == b"0000000000 65535 f "
+    for number, entry in enumerate(entries[1:], start=1):
+        offset = int(entry[:10])
+        assert pdf[offset:].startswith(f"{number} 0 obj\n".encode())
+    assert re.search(rb"/Size %d\b" % count, pdf)
+
+
+def test_png_renders_at_card_width():
+    from PIL import Image
+
+    img = Image.open(io.BytesIO(render_png(fields())))
+    assert img.format == "PNG"
+    assert img.width == strategy_card.PNG_WIDTH
+
+
+def test_cards_are_rendered_once_per_content():
+    card = fields()
+    key, fut = request_card(card)
+    assert key == card_hash(card)
+    assert request_card(dict(card)) == (key, fut)
+    assert set(fut.result(timeout=30)) == {"pdf", "png"}
+    other_key, _ = request_card({**card, "team_size": "39"})
+    assert other_key != key
+
+
+def test_registry_round_trip(registry_path):
+    a, b = CardRegistry(registry_path), CardRegistry(registry_path)
+    first, second = fields(), fields()
+    a.register("cohort-1", "session-a", first)
+    b.register("cohort-1", "session-b", second)
+    b.register("cohort-2", "session-c", fields())
+    # Re-locking a session replaces its card
+    a.register("cohort-1", "session-a", {**first, "team_size": "40"})
+
+    assert b.size("cohort-1") == 2
+    assert [sid for sid, _ in b.cards("cohort-1")] == ["session-b", "session-a"]
+    assert dict(b.cards("cohort-1"))["session-a"]["team_size"] == "40"
+
+
+def test_archive_contains_every_card(registry_path):
+    cards = {"session-aaaaaaaa": fields(), "session-bbbbbbbb": fields()}
+    for sid, card in cards.items():
+        strategy_card.register_card("cohort-x", sid, card)
+
+    archive, failed = build_cohort_archive("cohort-x")
+    assert failed == []
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        names = sorted(zf.namelist())
+        assert len(names) == 4
+        assert all(n.startswith("cohort-x/card-") for n in names)
+        pdfs = [n for n in names if n.endswith(".pdf")]
+        assert all(zf.read(n).startswith(b"%PDF") for n in pdfs)
+        assert any(card_hash(cards["session-aaaaaaaa"])[:8] in n for n in pdfs)
+
+
+def test_archive_skips_cards_that_fail_to_render(registry_path, monkeypatch):
+    real_render = strategy_card._render
+
+    def render(card):
+        if "broken" in card["statement"]:
+            raise ValueError("bad glyph")
+        return real_render(card)
+
+    monkeypatch.setattr(strategy_card, "_render", render)
+    strategy_card.register_card("cohort-y", "good-session", fields())
+    strategy_card.register_card("cohort-y", "broken-session", fields(f"broken {uuid.uuid4().hex}"))
+
+    archive, failed = build_cohort_archive("cohort-y")
+    assert failed == ["broken-session"]
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        assert len(zf.namelist()) == 2
@@ -0,0 +1,55 @@
+import pytest
+
+from token_ledger import (
+    BUDGET_ECONOMY, BUDGET_OK, BUDGET_SHORT, BUDGET_STOPPED,
+    TokenLedger, budget_stage, worst_stage,
+)
+
+
+@pytest.mark.parametrize("used, stage", [
+    (0, BUDGET_OK),
+    (699, BUDGET_OK),
+    (700, BUDGET_ECONOMY),
+    (849, BUDGET_ECONOMY),
+    (850, BUDGET_SHORT),
+    (999, BUDGET_SHORT),
+    (1000, BUDGET_STOPPED),
+    (1500, BUDGET_STOPPED),
+])
+def test_budget_stage_boundaries(used, stage):
+    assert budget_stage(used, 1000) == stage
+
+
+def test_no_cap_means_no_limit():
+    assert budget_stage(10**9, None) == BUDGET_OK
+    assert budget_stage(10**9, 0) == BUDGET_OK
+
+
+def test_worst_stage_picks_the_tighter_cap():
+    assert worst_stage(BUDGET_OK, BUDGET_ECONOMY) == BUDGET_ECONOMY
+    assert worst_stage(BUDGET_STOPPED, BUDGET_SHORT) == BUDGET_STOPPED
+    assert worst_stage(BUDGET_SHORT, BUDGET_ECONOMY, BUDGET_OK) == BUDGET_SHORT
+    assert worst_stage(BUDGET_OK) == BUDGET_OK
+
+
+def test_ledger_totals_and_cohort_report(tmp_path):
+    path = str(tmp_path / "ledger.sqlite3")
+    ledger = TokenLedger(path)
+    ledger.record("aaaaaaaa-session", "cohort-1", "sonnet", 1000, 200)
+    ledger.record("aaaaaaaa-session", "cohort-1", "haiku", 300, 50)
+    ledger.record("bbbbbbbb-session", "cohort-1", "sonnet", 10, 5)
+    # Another worker writing to the same file
+    TokenLedger(path).record("cccccccc-session", "cohort-2", "sonnet", 7, 3)
+
+    assert ledger.session_total("aaaaaaaa-session") == 1550
+    assert ledger.session_total("missing") == 0
+    assert ledger.cohort_total("cohort-1") == 1565
+    assert ledger.cohort_total("cohort-2") == 10
+
+    # Newest session first, ids shortened for display
+    rows = ledger.cohort_report("cohort-1")
+    assert [(r["session"], r["calls"], r["input_tokens"], r["output_tokens"], r["total"]) for r in rows] == [
+        ("bbbbbbbb", 1, 10, 5, 15),
+        ("aaaaaaaa", 2, 1300, 250, 1550),
+    ]
+    assert ledger.cohort_report("cohort-3") == []
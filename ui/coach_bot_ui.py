@@ -1,19 +1,50 @@
 import os
 import re
 import json
+import functools
+import time
+import uuid
 from typing import Optional, Tuple, List
 
+# Start of this rerun, for the time-to-password-screen / time-to-first-reply metrics
+RUN_STARTED = time.perf_counter()
+
 import streamlit as st
-import anthropic
+
+from page_assets import CSS, HEADER_HTML, HERO_HTML, INTRO_CARD_HTML
+from prompts import current_prompt_version, prompt_label, resolve_prompt
+from profiler import (
+    TIME_TO_FIRST_REPLY, TIME_TO_PASSWORD_SCREEN,
+    Profiler, chrome_trace_json, profiling_enabled, startup_metrics,
+)
+from intents import (
+    AFFIRM, RESET, UNDO, SHOW_STATEMENT, SET_COMPONENT, REVISE,
+    Intent, asked_commitment, classify_intent,
+)
+from state_history import StateHistory
+from session_store import STORED_FIELDS, SessionConflict, StoredSession, get_store
 
 # ------------------------------------------------------------
 # Strategy Coach (POC) - Streamlit Front-End (Claude)
 #
 # Setup:
-# 1) Put your system prompt in system_prompt.txt (same folder as this file)
+# 1) Put your system prompt in coaches/strategy/system_prompt.txt
 # 2) Set ANTHROPIC_API_KEY in Streamlit secrets or environment
 # 3) Set APP_PASSWORD in Streamlit secrets (for Cloud) or environment (local)
 # 4) Run: streamlit run coach_bot_ui.py
+# 5) Optional: set COACH_PROFILE=1 to record per-rerun timing spans
+# 6) Optional: ANTHROPIC_FALLBACK_MODEL for failover when the primary is overloaded,
+#    HEDGE_AFTER_SECONDS to fix the hedge delay (default: observed p95),
+#    HEDGE_ON_FALLBACK=1 to send the hedged duplicate to the fallback model,
+#    REQUEST_TIMEOUT_SECONDS to bound a single model request (default 60)
+# 7) Optional: MULTI_DRAFT_COUNT sets how many alternative statements to generate (default 3, max 4)
+# 8) Optional: COHORT_ID groups sessions for facilitators; FACILITATOR_PASSWORD
+#    unlocks the facilitator tools in the sidebar (bulk card export, token ledger)
+# 9) Optional: SESSION_TOKEN_CAP / COHORT_TOKEN_CAP limit spend. Near a cap the
+#    app moves to ANTHROPIC_ECONOMY_MODEL, then trims context, then stops politely
+# 10) Optional: SESSION_STORE=sqlite (one host) or redis://host:6379/0 (several hosts;
+#    needs `pip install redis`) lets any worker pick up a session from its ?sid= link
+#    (default: memory)
 # ------------------------------------------------------------
 
 STATE_OPEN = "<STATE_JSON>"
@@ -42,6 +73,14 @@ INITIAL_EXAMPLES = [
 
 COMMITMENT_QUESTION = "Are you prepared to back this with resources and focus?"
 
+DEFAULT_ECONOMY_MODEL = "claude-3-5-haiku-latest"
+# Messages kept when the budget forces a shorter context
+SHORT_CONTEXT_MESSAGES = 6
+BUDGET_STOP_MESSAGE = (
+    "We've reached the usage limit for this session, so I'll stop here. "
+    "Your working strategy is in the sidebar — your facilitator can help you take it from here."
+)
+
 
 # -----------------------------
 # Page config
@@ -53,370 +92,42 @@ st.set_page_config(
     initial_sidebar_state="collapsed",  # sidebar hidden by default for end users
 )
 
-# -----------------------------
-# Styling (Centre-inspired: clean, blue, lots of whitespace)
-# -----------------------------
-def inject_css():
-    st.markdown(
-        """
-        <style>
-          @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-
-          :root{
-            --brand:#003366;
-            --brand-mid:#0B63B6;
-            --brand-dark:#002244;
-            --ink:#0B1220;
-            --muted:#5B6B7A;
-            --bg:#FFFFFF;
-            --card:#F4F7FB;
-            --border:#DDE5EF;
-            --accent:#E8F0FA;
-          }
-
-          html, body, [class*="css"] {
-            font-family: 'Inter', sans-serif;
-          }
-
-          /* Keep Streamlit toolbar visible but hide the bar background */
-          #MainMenu {visibility: hidden;}
-          footer {visibility: hidden;}
-          header[data-testid="stHeader"] {
-            background: transparent !important;
-            box-shadow: none !important;
-          }
-
-          div[data-testid="stToolbar"]{
-            opacity: 0.25;
-            transition: opacity 120ms ease-in-out;
-          }
-          div[data-testid="stToolbar"]:hover{ opacity: 1; }
-
-          /* Push content down to clear the CBG header + sticky progress bar */
-          .block-container {
-            padding-top: 0rem !important;
-            padding-left: 1rem !important;
-            padding-right: 1rem !important;
-            max-width: 860px;
-          }
-
-          /* Full-bleed header */
-          .cbg-header-wrap {
-            margin: -1rem -1rem 2rem -1rem;
-          }
-
-          /* Brand header bar — square/blocky per Centre CI */
-          .cbg-header {
-            background: var(--brand);
-            color: white;
-            padding: 14px 36px;
-            display: flex;
-            align-items: center;
-            gap: 24px;
-            border-radius: 0;
-          }
-          .cbg-header .org {
-            font-size: 0.70rem;
-            font-weight: 500;
-            opacity: 0.65;
-            letter-spacing: 0.09em;
-            text-transform: uppercase;
-            line-height: 1;
-            margin-bottom: 5px;
-          }
-          .cbg-header .tool {
-            font-size: 1.1rem;
-            font-weight: 700;
-            line-height: 1.2;
-            letter-spacing: -0.01em;
-            color: white;
-          }
-          .cbg-header .hdr-divider {
-            width: 1px;
-            height: 38px;
-            background: rgba(255,255,255,0.22);
-            flex-shrink: 0;
-          }
-          .cbg-header .tagline {
-            font-size: 0.80rem;
-            opacity: 0.55;
-            margin-top: 4px;
-            font-style: italic;
-          }
-
-          /* Centre wordmark SVG */
-          .cbg-wordmark {
-            width: 140px;
-            height: 48px;
-            flex-shrink: 0;
-          }
-
-          /* Hero intro */
-          .hero-intro {
-            text-align: center;
-            padding: 0.5rem 0 1.5rem 0;
-          }
-          .hero-intro h2 {
-            font-size: 1.65rem;
-            font-weight: 700;
-            color: var(--ink);
-            letter-spacing: -0.02em;
-            margin-bottom: 0.6rem;
-          }
-          .hero-intro p {
-            font-size: 1rem;
-            color: var(--muted);
-            line-height: 1.65;
-            max-width: 580px;
-            margin: 0 auto;
-          }
-
-          /* Intro card — square corners per Centre CI */
-          .intro-card {
-            background: var(--card);
-            border: 1px solid var(--border);
-            border-left: 4px solid var(--brand-mid);
-            border-radius: 0;
-            padding: 20px 24px;
-            margin: 0 0 10px 0;
-          }
-          .intro-card .card-title {
-            font-size: 0.82rem;
-            font-weight: 700;
-            text-transform: uppercase;
-            letter-spacing: 0.07em;
-            color: var(--brand-mid);
-            margin-bottom: 10px;
-          }
-          .intro-card p {
-            font-size: 0.96rem;
-            color: var(--ink);
-            line-height: 1.6;
-            margin: 0 0 10px 0;
-          }
-          .intro-card p:last-child { margin-bottom: 0; }
-
-          /* Step progress indicator */
-          .step-progress {
-            display: flex;
-            align-items: center;
-            margin: 24px 0 20px 0;
-            padding: 0 4px;
-          }
-          .step-item {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            position: relative;
-            flex: 1;
-          }
-          /* Connecting line between steps */
-          .step-item:not(:last-child)::after {
-            content: '';
-            position: absolute;
-            top: 14px;
-            left: calc(50% + 14px);
-            right: calc(-50% + 14px);
-            height: 2px;
-            background: var(--border);
-            z-index: 0;
-          }
-          .step-item.done:not(:last-child)::after {
-            background: var(--brand-mid);
-          }
-          /* Step circle */
-          .step-circle {
-            width: 28px;
-            height: 28px;
-            border-radius: 50%;
-            border: 2px solid var(--border);
-            background: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 0.72rem;
-            font-weight: 700;
-            color: var(--muted);
-            position: relative;
-            z-index: 1;
-            flex-shrink: 0;
-          }
-          .step-item.current .step-circle {
-            border-color: var(--brand);
-            background: var(--brand);
-            color: white;
-          }
-          .step-item.done .step-circle {
-            border-color: var(--brand-mid);
-            background: var(--brand-mid);
-            color: white;
-          }
-          /* Tick for done */
-          .step-item.done .step-circle::after {
-            content: '✓';
-            font-size: 0.75rem;
-            font-weight: 700;
-          }
-          /* Step label */
-          .step-label {
-            margin-top: 6px;
-            font-size: 0.72rem;
-            font-weight: 500;
-            color: var(--muted);
-            text-align: center;
-            letter-spacing: 0.02em;
-            white-space: nowrap;
-          }
-          .step-item.current .step-label {
-            color: var(--brand);
-            font-weight: 700;
-          }
-          .step-item.done .step-label {
-            color: var(--brand-mid);
-          }
-
-          /* Chat bubbles — square */
-          [data-testid="stChatMessage"] {
-            border-radius: 3px;
-            padding: 4px 0;
-          }
-
-          /* Buttons — square, brand blue */
-          .stButton>button {
-            border-radius: 3px;
-            font-size: 0.88rem;
-            padding: 0.45rem 0.9rem;
-            border: 1.5px solid var(--border);
-            font-weight: 500;
-          }
-          .stButton>button:hover {
-            border-color: var(--brand-mid);
-            color: var(--brand-mid);
-          }
-
-          /* Reset button — compact, muted, right-aligned with message box */
-          [data-testid="stMain"] [data-testid="stHorizontalBlock"] > [data-testid="stColumn"]:last-child .stButton > button {
-            padding: 0.1rem 0.5rem !important;
-            font-size: 0.73rem !important;
-            font-weight: 400 !important;
-            color: var(--muted) !important;
-            border-color: var(--border) !important;
-            width: 100%;
-          }
-          [data-testid="stMain"] [data-testid="stHorizontalBlock"] > [data-testid="stColumn"]:last-child .stButton > button:hover {
-            color: var(--brand-mid) !important;
-            border-color: var(--brand-mid) !important;
-          }
-
-          /* Send button — square, navy, not red */
-          div[data-testid="stForm"] button[kind="primary"],
-          button[kind="primary"],
-          .stFormSubmitButton button {
-            background: var(--brand) !important;
-            border-color: var(--brand) !important;
-            border-radius: 3px !important;
-            font-weight: 600 !important;
-            letter-spacing: 0.02em !important;
-            color: white !important;
-          }
-          div[data-testid="stForm"] button[kind="primary"]:hover,
-          .stFormSubmitButton button:hover {
-            background: var(--brand-dark) !important;
-            border-color: var(--brand-dark) !important;
-          }
-
-          section[data-testid="stSidebar"] {
-            border-right: 1px solid var(--border);
-          }
-
-          /* Always show the sidebar collapse (<<) button — not just on hover */
-          [data-testid="stSidebarCollapseButton"] {
-            position: fixed !important;
-            top: 1rem !important;
-            z-index: 999 !important;
-          }
-          [data-testid="stSidebarCollapseButton"] button {
-            opacity: 1 !important;
-          }
-
-          /* Agent-style conversation transcript — single column, no bubbles */
-          .chat-feed {
-            display: flex;
-            flex-direction: column;
-            gap: 0;
-            margin: 8px 0 16px 0;
-          }
-          /* Each exchange = one Marvin turn + optional user reply */
-          .chat-exchange {
-            border-bottom: 1px solid var(--border);
-            padding: 20px 0;
-          }
-          .chat-exchange:last-child {
-            border-bottom: none;
-          }
-          /* Marvin label */
-          .chat-speaker {
-            font-size: 0.72rem;
-            font-weight: 700;
-            text-transform: uppercase;
-            letter-spacing: 0.08em;
-            margin-bottom: 6px;
-          }
-          .chat-speaker.marvin {
-            color: var(--brand);
-          }
-          .chat-speaker.user {
-            color: var(--muted);
-          }
-          /* Message text */
-          .chat-text {
-            font-size: 0.97rem;
-            line-height: 1.7;
-            color: var(--ink);
-          }
-          .chat-text.marvin-text {
-            color: var(--ink);
-          }
-          .chat-text.user-text {
-            color: #4B5563;
-            font-style: italic;
-            padding-left: 14px;
-            border-left: 2px solid #C5D8EA;
-            margin-top: 14px;
-          }
-
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+# Per-session rerun profiler (no-op unless COACH_PROFILE is set)
+if "profiler" not in st.session_state:
+    st.session_state.profiler = Profiler(profiling_enabled())
+profiler = st.session_state.profiler
+profiler.begin()
 
-def load_system_prompt() -> str:
-    here = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(here, "..", "coaches", "strategy", "system_prompt.txt")
-    
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"system_prompt.txt not found next to coach_bot_ui.py. Expected at: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read().strip()
+
+def timed_section(name: str):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiler.section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def get_setting(name: str) -> Optional[str]:
+    with profiler.span("secrets"):
+        return st.secrets.get(name) or os.environ.get(name)
 
 
-def get_prompt_version() -> str:
-    """Extract version string from the second line of system_prompt.txt."""
-    here = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(here, "..", "coaches", "strategy", "system_prompt.txt")
+def numeric_setting(name: str, default=None, cast=float):
+    """A numeric setting, or `default` when it is unset, malformed or not positive."""
+    raw = get_setting(name)
+    if raw is None or str(raw).strip() == "":
+        return default
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-        for line in lines[:5]:
-            if "VERSION" in line.upper():
-                # Extract e.g. "V10.0" from "VERSION V10.0 — Centre for Business Growth"
-                parts = line.strip().split()
-                for part in parts:
-                    if part.upper().startswith("V") and any(c.isdigit() for c in part):
-                        return part.strip("—").strip()
-    except Exception:
-        pass
-    return "unknown"
+        value = cast(str(raw).strip())
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def cohort_id() -> str:
+    return get_setting("COHORT_ID") or "default"
 
 
 def split_user_text_and_state(full_text: str) -> Tuple[str, Optional[dict]]:
@@ -449,6 +160,9 @@ def normalise_state(state: dict) -> dict:
         s = as_str(x).strip()
         return [s] if s else []
 
+    def as_bool(x):
+        return x is True or as_str(x).strip().lower() == "true"
+
     out = {
         "business_type": as_str(state.get("business_type", "")).strip(),
         "industry": as_str(state.get("industry", "")).strip(),
@@ -459,6 +173,7 @@ def normalise_state(state: dict) -> dict:
         "strategic_assumptions": as_list_str(state.get("strategic_assumptions", []))[:5],
         "current_phase": as_str(state.get("current_phase", "")).strip(),
         "next_question": as_str(state.get("next_question", "")).strip(),
+        "awaiting_commitment": as_bool(state.get("awaiting_commitment", False)),
         "draft_statement": as_str(state.get("draft_statement", "")).strip(),
         "refined_statement": as_str(state.get("refined_statement", "")).strip(),
     }
@@ -493,24 +208,142 @@ def normalise_state(state: dict) -> dict:
     return out
 
 
-def is_affirmation(text: str) -> bool:
-    t = (text or "").strip().lower()
-    if not t:
-        return False
-    yes_patterns = [
-        r"^\s*yes\s*$",
-        r"^\s*yep\s*$",
-        r"^\s*yeah\s*$",
-        r"^\s*yeh\s*$",
-        r"^\s*absolutely\s*$",
-        r"^\s*i\s+am\s*$",
-        r"^\s*we\s+are\s*$",
-        r"^\s*ok\s*$",
-        r"^\s*okay\s*$",
-        r"^\s*sure\s*$",
-        r"^\s*let'?s\s+do\s+it\s*$",
+def final_strategy_from_state(state: dict) -> Optional[dict]:
+    draft_stmt = (state.get("draft_statement") or "").strip()
+    refined_stmt = (state.get("refined_statement") or "").strip()
+    if not (draft_stmt or refined_stmt):
+        return None
+    return {
+        "draft": draft_stmt,
+        "refined": refined_stmt,
+        "assumptions": (state.get("strategic_assumptions") or [])[:5],
+    }
+
+
+def describe_state(state: dict) -> str:
+    lines = [
+        f"Objective: {state.get('objective') or '—'}",
+        f"Scope: {state.get('scope') or '—'}",
+        f"Advantage: {state.get('advantage') or '—'}",
     ]
-    return any(re.search(p, t) for p in yes_patterns)
+    statement = state.get("refined_statement") or state.get("draft_statement")
+    if statement:
+        lines.append(f"\nStatement: {statement}")
+    return "\n".join(lines)
+
+
+def session_store():
+    return get_store(get_setting("SESSION_STORE"))
+
+
+def load_stored_session(stored: StoredSession) -> None:
+    st.session_state.chat = stored.chat
+    for k in STORED_FIELDS:
+        if k in stored.fields:
+            st.session_state[k] = stored.fields[k]
+    st.session_state.has_started = any(m["role"] == "user" for m in stored.chat)
+    # Undo history and named drafts aren't stored, so a session picked up by
+    # another worker starts a fresh history at its current state
+    st.session_state.state_history = StateHistory(st.session_state.strategy_state)
+    st.session_state.store_version = stored.version
+    st.session_state.store_chat_len = len(stored.chat)
+
+
+def persist_session() -> None:
+    """Mirror the turn to the shared store: only the new chat messages, plus the small fields."""
+    chat = st.session_state.chat
+    synced = min(st.session_state.get("store_chat_len", 0), len(chat))
+    fields = {k: st.session_state.get(k) for k in STORED_FIELDS}
+    with profiler.span("session_store"):
+        try:
+            st.session_state.store_version = session_store().save(
+                st.session_state.session_id,
+                st.session_state.get("store_version", 0),
+                synced,
+                chat[synced:],
+                fields,
+            )
+            st.session_state.store_chat_len = len(chat)
+        except SessionConflict:
+            # Another worker (a second tab, or a reconnect) saved first: take its version
+            stored = session_store().load(st.session_state.session_id)
+            if stored is not None:
+                load_stored_session(stored)
+            st.session_state.last_error = "This session was updated in another window, so the latest version is shown."
+
+
+def invalidate() -> None:
+    """chat or strategy_state changed: rerun the whole page, not just the calling fragment."""
+    persist_session()
+    st.session_state.data_rev = st.session_state.get("data_rev", 0) + 1
+    st.rerun(scope="app")
+
+
+def restore_state(state: Optional[dict], note: str) -> None:
+    # Rolled-back state goes into the transcript too, so Marvin continues from it
+    if not state:
+        return
+    st.session_state.strategy_state = state
+    st.session_state.final_strategy = final_strategy_from_state(state)
+    st.session_state.chat.append({"role": "assistant", "content": f"{note}\n\n{describe_state(state)}"})
+    invalidate()
+
+
+SESSION_KEYS = [
+    "chat", "strategy_state", "composer_text", "last_error",
+    "has_started", "final_strategy", "is_locked", "assistant_asked_commitment",
+    "state_history", "data_rev", "transcript_cache", "prompt_version", "draft_candidates",
+    "store_version", "store_chat_len", "first_reply_timed",
+]
+
+
+def reset_session() -> None:
+    session_store().delete(st.session_state.session_id)
+    for k in SESSION_KEYS:
+        st.session_state.pop(k, None)
+    st.rerun()
+
+
+def apply_orientation(fields: dict) -> None:
+    """Fill orientation fields the session doesn't have yet (never overwrites)."""
+    updated = dict(st.session_state.strategy_state)
+    missing = {k: v for k, v in fields.items() if v and not updated.get(k)}
+    if not missing:
+        return
+    updated.update(missing)
+    st.session_state.strategy_state = normalise_state(updated)
+    st.session_state.state_history.record(st.session_state.strategy_state, label="pasted document")
+
+
+def handle_local_intent(intent: Intent, user_text: str) -> None:
+    """Answer a recognised control message without calling the model."""
+    if intent.kind == RESET:
+        reset_session()
+
+    st.session_state.chat.append({"role": "user", "content": user_text})
+    history = st.session_state.state_history
+
+    if intent.kind == UNDO:
+        if not history.can_undo():
+            st.session_state.chat.append({"role": "assistant", "content": "There's nothing to undo yet."})
+            invalidate()
+        restore_state(history.undo(), note="Back to the previous version of your working strategy:")
+
+    if intent.kind == SHOW_STATEMENT:
+        st.session_state.chat.append(
+            {"role": "assistant", "content": f"Here's where your strategy stands:\n\n{describe_state(st.session_state.strategy_state)}"}
+        )
+        invalidate()
+
+    if intent.kind == SET_COMPONENT:
+        updated = dict(st.session_state.strategy_state)
+        updated[intent.component] = intent.value
+        st.session_state.strategy_state = normalise_state(updated)
+        history.record(st.session_state.strategy_state, label=f"set {intent.component}")
+        st.session_state.chat.append(
+            {"role": "assistant", "content": f"Updated your {intent.component}.\n\n{describe_state(st.session_state.strategy_state)}"}
+        )
+        invalidate()
 
 
 def require_password_gate() -> None:
@@ -519,7 +352,7 @@ def require_password_gate() -> None:
     - Streamlit Cloud: put APP_PASSWORD in Secrets
     - Local: set APP_PASSWORD env var
     """
-    expected = st.secrets.get("APP_PASSWORD") or os.environ.get("APP_PASSWORD")
+    expected = get_setting("APP_PASSWORD")
     if not expected:
         st.error("APP_PASSWORD is not set in Streamlit secrets or environment.")
         st.stop()
@@ -527,6 +360,8 @@ def require_password_gate() -> None:
     if st.session_state.get("authed", False):
         return
 
+    # Measured from the session's first rerun, so it includes that rerun's imports
+    st.session_state.setdefault("first_run_started", RUN_STARTED)
     st.markdown("##### For Centre for Business Growth program participants")
     st.caption("Enter your access password to continue.")
     with st.form("password_form"):
@@ -538,42 +373,217 @@ def require_password_gate() -> None:
                 st.rerun()
             else:
                 st.error("Password not recognised. Try again.")
+    if not st.session_state.get("password_screen_timed"):
+        st.session_state.password_screen_timed = True
+        startup_metrics.record(TIME_TO_PASSWORD_SCREEN, time.perf_counter() - st.session_state.first_run_started)
+        profiler.mark(TIME_TO_PASSWORD_SCREEN)
     st.stop()
 
 
-def call_model(conversation_messages: List[dict], session_mode: str) -> str:
-    api_key = st.secrets.get("ANTHROPIC_API_KEY") or os.environ.get("ANTHROPIC_API_KEY")
+# -----------------------------
+# App start
+#
+# Only the stylesheet, header and password gate run before a participant is
+# let in. The model SDK and the feature modules are imported after the gate,
+# so a cold worker reaches the password screen without paying for them.
+# -----------------------------
+with profiler.span("css"):
+    st.markdown(CSS, unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
+require_password_gate()
+# The first rerun past the gate pays for the imports below; the first reply is timed from it
+st.session_state.setdefault("post_gate_started", RUN_STARTED)
+
+with profiler.span("imports"):
+    from resilience import REQUEST_TIMEOUT_SECONDS, get_policy
+    from drafts import EMPHASIS_LABELS, MAX_DRAFTS, draft_basis, generate_drafts
+    from ingest import build_digest, is_large
+    from revisions import build_revision_request, last_exchange, merge_revision, revision_instructions
+    from statement_lint import format_hints, lint_message, lint_state
+    from visual_aids import VisualAid, aid_for_state
+    from token_ledger import (
+        BUDGET_OK, BUDGET_ECONOMY, BUDGET_SHORT, BUDGET_STOPPED,
+        budget_stage, get_ledger, worst_stage,
+    )
+    from strategy_card import (
+        build_cohort_archive, card_fields, card_filename, cohort_size, register_card, request_card,
+    )
+
+
+def model_settings(budget: str) -> dict:
+    # Read on the script thread; worker threads (parallel drafts) get the resolved values
+    api_key = get_setting("ANTHROPIC_API_KEY")
     if not api_key:
         raise RuntimeError("ANTHROPIC_API_KEY is not set (Streamlit secrets or environment variable).")
+    # Budget degradation starts with the smaller model, whatever the call path
+    if budget in (BUDGET_ECONOMY, BUDGET_SHORT):
+        model = get_setting("ANTHROPIC_ECONOMY_MODEL") or DEFAULT_ECONOMY_MODEL
+    else:
+        model = get_setting("ANTHROPIC_MODEL") or "claude-3-5-sonnet-latest"
+    return {
+        "api_key": api_key,
+        "model": model,
+        "fallback_model": get_setting("ANTHROPIC_FALLBACK_MODEL"),
+        "hedge_after": numeric_setting("HEDGE_AFTER_SECONDS"),
+        "timeout": numeric_setting("REQUEST_TIMEOUT_SECONDS", REQUEST_TIMEOUT_SECONDS),
+        "hedge_to_fallback": (get_setting("HEDGE_ON_FALLBACK") or "").strip().lower() in ("1", "true", "yes"),
+        "usage_owner": (st.session_state.session_id, cohort_id()),
+    }
 
-    model_name = (
-        st.secrets.get("ANTHROPIC_MODEL")
-        or os.environ.get("ANTHROPIC_MODEL")
-        or "claude-3-5-sonnet-latest"
+
+def budget_status() -> Tuple[str, int, int]:
+    """(stage, session tokens used, cohort tokens used) against the configured caps."""
+    session_cap = numeric_setting("SESSION_TOKEN_CAP", cast=int)
+    cohort_cap = numeric_setting("COHORT_TOKEN_CAP", cast=int)
+    if not (session_cap or cohort_cap):
+        return BUDGET_OK, 0, 0
+    with profiler.span("token_ledger"):
+        ledger = get_ledger()
+        session_used = ledger.session_total(st.session_state.session_id)
+        cohort_used = ledger.cohort_total(cohort_id())
+    stage = worst_stage(
+        budget_stage(session_used, session_cap),
+        budget_stage(cohort_used, cohort_cap),
     )
+    return stage, session_used, cohort_used
+
+
+def create_message(
+    system_prompt: str,
+    messages: List[dict],
+    max_tokens: int = 2000,
+    temperature: float = 0.4,
+    *,
+    settings: dict,
+) -> str:
+    import anthropic  # deferred: the heaviest import, and not needed before the gate
+
+    # No SDK retries: failover and hedging are the policy's job, and retries would skew its p95
+    client = anthropic.Anthropic(api_key=settings["api_key"], max_retries=0, timeout=settings["timeout"])
+
+    session_id, cohort = settings["usage_owner"]
+
+    def send(model: str):
+        response = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=messages,
+        )
+        # Recorded here so a hedge's losing request is billed too
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            try:
+                get_ledger().record(session_id, cohort, model, usage.input_tokens, usage.output_tokens)
+            except Exception:
+                # Bookkeeping only: a locked or unwritable ledger must not fail (or re-send) the reply
+                pass
+        return response
+
+    # Hedged after the observed p95, failing over to the fallback model when the primary is down
+    response = get_policy().call(
+        send,
+        primary=settings["model"],
+        fallback=settings["fallback_model"],
+        hedge_to_fallback=settings["hedge_to_fallback"],
+        hedge_after=settings["hedge_after"],
+    )
+
+    return "".join(block.text for block in response.content if hasattr(block, "text"))
 
-    client = anthropic.Anthropic(api_key=api_key)
 
-    system_prompt = ""
-    if conversation_messages and conversation_messages[0]["role"] == "system":
-        system_prompt = conversation_messages[0]["content"]
+def generate_alternative_drafts(
+    prompt_version: str, state: dict, n: int, budget: str = BUDGET_OK
+) -> Tuple[List[dict], int]:
+    settings = model_settings(budget)
+    return generate_drafts(
+        lambda system, messages: create_message(system, messages, max_tokens=600, settings=settings),
+        resolve_prompt(prompt_version),
+        state,
+        n=n,
+    )
+
 
+def current_draft_candidates() -> List[dict]:
+    """Candidates built from the current state; older ones are dropped."""
+    basis = draft_basis(st.session_state.strategy_state)
+    candidates = [c for c in st.session_state.draft_candidates if c.get("basis") == basis]
+    if len(candidates) != len(st.session_state.draft_candidates):
+        st.session_state.draft_candidates = candidates
+    return candidates
+
+
+def choose_draft(candidate: dict) -> None:
+    if candidate.get("basis") != draft_basis(st.session_state.strategy_state):
+        # The state moved on since this candidate was drafted
+        st.session_state.draft_candidates = []
+        return
+    updated = dict(st.session_state.strategy_state)
+    updated["draft_statement"] = candidate["draft"]
+    updated["refined_statement"] = candidate["refined"]
+    st.session_state.strategy_state = normalise_state(updated)
+    st.session_state.state_history.record(st.session_state.strategy_state, label="chosen draft")
+    st.session_state.final_strategy = final_strategy_from_state(st.session_state.strategy_state)
+    st.session_state.draft_candidates = []
+    # Echo the pick into the transcript so Marvin carries on from it
+    content = f"Draft:\n{candidate['draft']}"
+    if candidate["refined"]:
+        content += f"\n\nRefined:\n{candidate['refined']}"
+    content += "\n\nDoes the refined version capture it, or does something need adjusting?"
+    st.session_state.chat.append({"role": "assistant", "content": content})
+    invalidate()
+
+
+def mode_hint(session_mode: str) -> str:
     if session_mode == "Board":
-        mode_hint = (
+        return (
             "\n\nSession mode: Board.\n"
             "- Be more direct and exact.\n"
             "- Pressure-test targets with practical questions.\n"
             "- Keep it grounded and short.\n"
         )
-    else:
-        mode_hint = (
-            "\n\nSession mode: Workshop.\n"
-            "- Keep it practical and easy to answer.\n"
-            "- Ask one question at a time.\n"
-            "- Use plain language.\n"
-        )
+    return (
+        "\n\nSession mode: Workshop.\n"
+        "- Keep it practical and easy to answer.\n"
+        "- Ask one question at a time.\n"
+        "- Use plain language.\n"
+    )
+
 
-    system_prompt = f"{system_prompt}{mode_hint}"
+def call_revision(
+    component: str,
+    revision: str,
+    session_mode: str,
+    prompt_version: str,
+    hints: Optional[str] = None,
+    budget: str = BUDGET_OK,
+) -> str:
+    """Scoped revision turn: working state, the component and the last exchange, not the transcript."""
+    settings = model_settings(budget)
+    system_prompt = (
+        f"{resolve_prompt(prompt_version)}{mode_hint(session_mode)}"
+        f"{revision_instructions(component)}{hints or ''}"
+    )
+    # The revision itself is already the last chat message
+    request = build_revision_request(
+        st.session_state.strategy_state, component, revision, last_exchange(st.session_state.chat[:-1])
+    )
+    return create_message(system_prompt, [{"role": "user", "content": request}], max_tokens=1000, settings=settings)
+
+
+def call_model(
+    conversation_messages: List[dict],
+    session_mode: str,
+    prompt_version: str,
+    hints: Optional[str] = None,
+    budget: str = BUDGET_OK,
+) -> str:
+    # Shared per-process copy; sessions only carry the version key
+    system_prompt = resolve_prompt(prompt_version)
+    settings = model_settings(budget)
+
+    system_prompt = f"{system_prompt}{mode_hint(session_mode)}{hints or ''}"
 
     messages = [
         {"role": m["role"], "content": m["content"]}
@@ -581,6 +591,16 @@ def call_model(conversation_messages: List[dict], session_mode: str) -> str:
         if m["role"] in ["user", "assistant"]
     ]
 
+    # Budget degradation past the smaller model: a trimmed context carried by the state
+    if budget == BUDGET_SHORT and len(messages) > SHORT_CONTEXT_MESSAGES:
+        messages = messages[-SHORT_CONTEXT_MESSAGES:]
+        while messages and messages[0]["role"] != "user":
+            messages.pop(0)
+        system_prompt += (
+            "\n\nEarlier conversation has been trimmed. Working strategy so far:\n"
+            f"{describe_state(st.session_state.strategy_state)}\n"
+        )
+
     # Inject STATE_JSON compliance reminder every 4 turns
     if len(messages) >= 8 and len(messages) % 4 == 0:
         reminder = (
@@ -590,15 +610,7 @@ def call_model(conversation_messages: List[dict], session_mode: str) -> str:
         )
         messages.insert(-1, {"role": "user", "content": reminder})
 
-    response = client.messages.create(
-        model=model_name,
-        max_tokens=2000,
-        temperature=0.4,
-        system=system_prompt,
-        messages=messages,
-    )
-
-    return "".join(block.text for block in response.content if hasattr(block, "text"))
+    return create_message(system_prompt, messages, settings=settings)
     
     
 
@@ -664,66 +676,22 @@ def render_phase_tracker(current_phase: str, objective: str, scope: str, advanta
     )
 
 
-# -----------------------------
-# App start
-# -----------------------------
-inject_css()
-
-# Header bar — shown on ALL screens including login
-def render_header():
-    st.markdown(
-        """
-        <div class="cbg-header-wrap">
-          <div class="cbg-header">
-            <svg class="cbg-wordmark" viewBox="0 0 140 46" fill="none" xmlns="http://www.w3.org/2000/svg">
-              <text x="0" y="13" font-family="Inter,sans-serif" font-size="8.5" font-weight="500"
-                    fill="rgba(255,255,255,0.60)" letter-spacing="0.6">AUSTRALIAN CENTRE FOR</text>
-              <text x="0" y="30" font-family="Inter,sans-serif" font-size="16" font-weight="800"
-                    fill="white" letter-spacing="0.1">Business Growth</text>
-              <line x1="0" y1="36" x2="140" y2="36" stroke="rgba(255,255,255,0.18)" stroke-width="0.8"/>
-              <text x="0" y="44" font-family="Inter,sans-serif" font-size="7.5" font-weight="400"
-                    fill="rgba(255,255,255,0.45)" letter-spacing="0.3">Adelaide University</text>
-            </svg>
-            <div class="hdr-divider"></div>
-            <div>
-              <div class="tool">Marvin &mdash; Strategy Coach</div>
-              <div class="tagline">Good questions. Clear thinking. A strategy you can actually use.</div>
-            </div>
-          </div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-render_header()
-require_password_gate()
-
-# Hero intro
-st.markdown(
-    """
-    <div class="hero-intro">
-      <h2>Where does your business need to go?</h2>
-      <p>A good strategy isn't a long document. It's a clear answer to three questions: what are you trying to achieve, who are you focused on, and why do customers choose you.</p>
-      <p style="margin-top:0.75rem;">Most leaders know the answer intuitively. Marvin helps you find the words.</p>
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
-
-# Intro card
+# Hero intro and "What to expect" card
+st.markdown(HERO_HTML, unsafe_allow_html=True)
 with st.container():
-    st.markdown(
-        """
-        <div class="intro-card">
-          <div class="card-title">What to expect</div>
-          <p>Marvin will ask you a short series of focused questions about your objective, your customers, and what you're genuinely better at than the competition.</p>
-          <p>The conversation takes 10&ndash;15 minutes. At the end, you'll have a clear Strategy Statement &mdash; in plain language &mdash; that you can actually use.</p>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(INTRO_CARD_HTML, unsafe_allow_html=True)
 
 # Init session state
+if "session_id" not in st.session_state:
+    # The ?sid= link lets any worker (or a restarted one) pick the session back up
+    sid = st.query_params.get("sid", "")
+    st.session_state.session_id = sid if re.fullmatch(r"[0-9a-f]{32}", sid) else uuid.uuid4().hex
+    st.query_params["sid"] = st.session_state.session_id
+    with profiler.span("session_store"):
+        stored = session_store().load(st.session_state.session_id)
+    if stored is not None:
+        load_stored_session(stored)
+
 if "strategy_state" not in st.session_state:
     st.session_state.strategy_state = {
         "business_type": "",
@@ -735,14 +703,16 @@ if "strategy_state" not in st.session_state:
         "strategic_assumptions": [],
         "current_phase": "orientation",
         "next_question": "",
+        "awaiting_commitment": False,
         "draft_statement": "",
         "refined_statement": "",
     }
 
+if "prompt_version" not in st.session_state:
+    st.session_state.prompt_version = current_prompt_version()
+
 if "chat" not in st.session_state:
-    system_prompt = load_system_prompt()
     st.session_state.chat = [
-        {"role": "system", "content": system_prompt},
         {
             "role": "assistant",
             "content": (
@@ -754,6 +724,9 @@ if "chat" not in st.session_state:
         },
     ]
 
+if "state_history" not in st.session_state:
+    st.session_state.state_history = StateHistory(st.session_state.strategy_state)
+
 if "composer_text" not in st.session_state:
     st.session_state.composer_text = ""
 
@@ -772,13 +745,68 @@ if "is_locked" not in st.session_state:
 if "assistant_asked_commitment" not in st.session_state:
     st.session_state.assistant_asked_commitment = False
 
-# Sidebar
-with st.sidebar:
+if "data_rev" not in st.session_state:
+    st.session_state.data_rev = 0
+
+if "draft_candidates" not in st.session_state:
+    st.session_state.draft_candidates = []
+
+# -----------------------------
+# Page fragments
+#
+# Each section reruns on its own when a widget inside it is used. Anything
+# that changes chat or strategy_state calls invalidate(), which reruns the
+# whole page so every fragment redraws from the new data.
+# -----------------------------
+def drop_cohort_archive() -> None:
+    st.session_state.pop("cohort_archive", None)
+
+
+def render_facilitator_tools():
+    cohort = cohort_id()
+
+    st.markdown("**Token usage**")
+    ledger = get_ledger()
+    cohort_cap = numeric_setting("COHORT_TOKEN_CAP", cast=int)
+    cohort_used = ledger.cohort_total(cohort)
+    st.caption(f"Cohort total: {cohort_used:,} tokens" + (f" of {cohort_cap:,}" if cohort_cap else ""))
+    report = ledger.cohort_report(cohort)
+    if report:
+        st.dataframe(report, hide_index=True, use_container_width=True)
+
+    st.markdown("**Strategy cards**")
+    n_cards = cohort_size(cohort)
+    st.caption(f"Cohort '{cohort}': {n_cards} locked strategy cards.")
+    if st.button("Prepare cohort archive", disabled=not n_cards):
+        with st.spinner("Building archive…"), profiler.span("cohort_archive"):
+            archive, failed = build_cohort_archive(cohort)
+        if len(failed) < n_cards:
+            st.session_state.cohort_archive = archive
+        if failed:
+            st.warning(
+                f"{len(failed)} of {n_cards} cards couldn't be rendered and were left out: "
+                + ", ".join(sid[:8] for sid in failed)
+            )
+    if st.session_state.get("cohort_archive"):
+        st.download_button(
+            "Download cards (.zip)",
+            data=st.session_state.cohort_archive,
+            file_name=f"strategy-cards-{cohort}.zip",
+            mime="application/zip",
+            # Held only until it has been downloaded once
+            on_click=drop_cohort_archive,
+        )
+
+
+@st.fragment
+@timed_section("sidebar")
+def render_sidebar():
     st.subheader("Session")
-    session_mode = st.radio(
+    st.radio(
         "Mode",
         options=["Workshop", "Board"],
         index=0,
+        key="session_mode",
         help="Workshop is practical and easy-to-answer. Board is more direct and exact.",
         disabled=st.session_state.is_locked,
     )
@@ -809,6 +837,12 @@ with st.sidebar:
     st.markdown("**Advantage**")
     st.write(st.session_state.strategy_state.get("advantage") or "—")
 
+    findings = lint_state(st.session_state.strategy_state)
+    if findings:
+        st.markdown("**Checks**")
+        for f in findings:
+            st.caption(f"⚠ {f.message}")
+
     if st.session_state.strategy_state.get("strategic_assumptions") and phase in ["strategy_statement", "commit"]:
         st.markdown("**Assumptions**")
         for a in (st.session_state.strategy_state.get("strategic_assumptions") or [])[:5]:
@@ -830,38 +864,68 @@ with st.sidebar:
                 st.write(f"- {a}")
 
     st.divider()
-    st.subheader("Quick actions")
-    st.caption("Use to reopen a component mid-session.")
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("Revise objective", disabled=st.session_state.is_locked):
-            st.session_state.composer_text = "Revise objective: "
-            st.rerun()
-        if st.button("Revise scope", disabled=st.session_state.is_locked):
-            st.session_state.composer_text = "Revise scope: "
-            st.rerun()
-    with col2:
-        if st.button("Revise advantage", disabled=st.session_state.is_locked):
-            st.session_state.composer_text = "Revise advantage: "
-            st.rerun()
-        if st.button("Clear input", disabled=st.session_state.is_locked):
-            st.session_state.composer_text = ""
-            st.rerun()
+    st.subheader("Versions")
+    history = st.session_state.state_history
+    st.caption(f"Working on: {history.branch_name}")
+    if st.button("Undo last change", disabled=st.session_state.is_locked or not history.can_undo()):
+        restore_state(history.undo(), note="Back to the previous version of your working strategy:")
+
+    branches = history.branches()
+    if len(branches) > 1:
+        picked = st.selectbox(
+            "Switch draft",
+            options=branches,
+            index=branches.index(history.branch_name),
+            disabled=st.session_state.is_locked,
+        )
+        if picked != history.branch_name:
+            restore_state(history.checkout(picked), note=f"Switched to the '{picked}' draft:")
+
+    new_branch = st.text_input(
+        "Save as alternative draft",
+        key="new_branch_name",
+        placeholder="e.g. premium advantage",
+        disabled=st.session_state.is_locked,
+    )
+    if st.button("Save draft", disabled=st.session_state.is_locked or not new_branch.strip()):
+        try:
+            history.branch(new_branch)
+            st.session_state.last_error = ""
+        except ValueError as e:
+            st.session_state.last_error = str(e)
+        st.rerun(scope="fragment")
 
     if st.session_state.last_error:
         st.warning(st.session_state.last_error)
 
-# Phase tracker — always read directly from session_state
-render_phase_tracker(
-    current_phase=st.session_state.strategy_state.get("current_phase", "objective"),
-    objective=st.session_state.strategy_state.get("objective", ""),
-    scope=st.session_state.strategy_state.get("scope", ""),
-    advantage=st.session_state.strategy_state.get("advantage", ""),
-    is_locked=st.session_state.get("is_locked", False),
-)
+    facilitator_password = get_setting("FACILITATOR_PASSWORD")
+    if facilitator_password:
+        st.divider()
+        with st.expander("Facilitator", expanded=False):
+            if not st.session_state.get("facilitator"):
+                pw = st.text_input("Facilitator password", type="password", key="facilitator_pw")
+                if pw and pw == facilitator_password:
+                    st.session_state.facilitator = True
+                    st.rerun(scope="fragment")
+            else:
+                render_facilitator_tools()
+
+
+@st.fragment
+@timed_section("tracker")
+def render_tracker():
+    # Always read directly from session_state
+    render_phase_tracker(
+        current_phase=st.session_state.strategy_state.get("current_phase", "objective"),
+        objective=st.session_state.strategy_state.get("objective", ""),
+        scope=st.session_state.strategy_state.get("scope", ""),
+        advantage=st.session_state.strategy_state.get("advantage", ""),
+        is_locked=st.session_state.get("is_locked", False),
+    )
+
 
 # Chat messages — agent-style transcript, single column
-def render_chat_messages(messages):
+def build_chat_html(messages) -> str:
     import html as html_module
 
     # Pair messages into exchanges: each assistant message followed by optional user reply
@@ -879,7 +943,8 @@ def render_chat_messages(messages):
                 current_user = None
             current_assistant = m["content"]
         elif m["role"] == "user":
-            current_user = m["content"]
+            # A large paste shows as a preview of what was pasted; its digest is what later turns resend
+            current_user = m.get("preview") or m["content"]
 
     # Flush final
     if current_assistant is not None:
@@ -897,120 +962,347 @@ def render_chat_messages(messages):
         html_parts.append('</div>')
 
     html_parts.append('</div>')
-    st.markdown("".join(html_parts), unsafe_allow_html=True)
-
-render_chat_messages(st.session_state.chat)
-
-# Examples (optional)
-if not st.session_state.has_started and not st.session_state.is_locked:
-    with st.expander("Need a starting example? (Optional)", expanded=False):
-        cols = st.columns(3)
-        for i in range(3):
-            with cols[i]:
-                if st.button(f"Use example {i+1}", key=f"initial_ex_{i}"):
-                    st.session_state.composer_text = INITIAL_EXAMPLES[i]
-                    st.rerun()
-                st.caption(INITIAL_EXAMPLES[i])
-
-# Step indicator + Reset — sits just above the message box
-_phase = st.session_state.strategy_state.get("current_phase", "objective") or "objective"
-_phase_idx = DISPLAY_PHASES.index(_phase) + 1 if _phase in DISPLAY_PHASES else 1
-_phase_label = PHASE_LABELS.get(_phase, "Objective")
-_ind_col, _reset_col = st.columns([5, 1])
-with _ind_col:
+    return "".join(html_parts)
+
+
+@st.fragment
+@timed_section("transcript")
+def render_transcript():
+    # The transcript HTML only changes when chat does, so full reruns triggered
+    # elsewhere (quick actions, mode changes) reuse the last build
+    key = (st.session_state.data_rev, len(st.session_state.chat))
+    cached = st.session_state.get("transcript_cache")
+    if not cached or cached[0] != key:
+        cached = (key, build_chat_html(st.session_state.chat))
+        st.session_state.transcript_cache = cached
+    st.markdown(cached[1], unsafe_allow_html=True)
+
+
+def render_card_downloads(fields: dict, polling: bool):
+    _key, job = request_card(fields)
+    if not job.done():
+        st.caption("Preparing your strategy card…")
+        return
+    if polling:
+        # Ready: one full rerun redraws this panel without the poll timer
+        st.rerun()
+    if job.exception() is not None:
+        st.caption("The strategy card couldn't be rendered.")
+        return
+    files = job.result()
+    pdf_col, png_col = st.columns(2)
+    with pdf_col:
+        st.download_button(
+            "Download strategy card (PDF)",
+            data=files["pdf"],
+            file_name=card_filename(fields, "pdf"),
+            mime="application/pdf",
+        )
+    with png_col:
+        st.download_button(
+            "Download strategy card (PNG)",
+            data=files["png"],
+            file_name=card_filename(fields, "png"),
+            mime="image/png",
+        )
+
+
+def render_visual_aid(aid: VisualAid):
     st.markdown(
-        f'<div style="font-size:0.78rem;color:var(--muted);margin-bottom:4px;line-height:32px;">'
-        f'Step {_phase_idx} of {len(PHASES)} &nbsp;—&nbsp; <strong style="color:var(--brand);">{_phase_label}</strong>'
-        f'</div>',
+        f'<div class="visual-aid"><div class="card-title">{aid.title}</div>{aid.svg}'
+        f'<p>{aid.caption}</p></div>',
         unsafe_allow_html=True,
     )
-with _reset_col:
-    if st.button(
-        "↺ Reset",
-        help="Clears the entire conversation and starts again from Step 1.",
-        key="reset_main",
-        use_container_width=True,
-    ):
-        for k in [
-            "chat", "strategy_state", "composer_text", "last_error",
-            "has_started", "final_strategy", "is_locked", "assistant_asked_commitment",
-        ]:
-            st.session_state.pop(k, None)
-        st.rerun()
 
-# Composer
-# Critical: clear_on_submit=True so we don't mutate st.session_state["composer_text"] after widget instantiation
-with st.form("composer_form", clear_on_submit=True):
-    composer = st.text_area(
-        "Message",
-        key="composer_text",
-        placeholder="Type your message…",
-        height=120,
-        disabled=st.session_state.is_locked,
-    )
-    send = st.form_submit_button("Send", type="primary", disabled=st.session_state.is_locked)
 
-if st.session_state.is_locked:
-    st.info("Session complete. Use Reset to start again.")
+def prefill_composer(text: str) -> None:
+    # Button callback: runs before the fragment reruns, so the text area picks it up
+    st.session_state.composer_text = text
+
+
+@st.fragment
+@timed_section("composer")
+def render_composer():
+    # Examples (optional)
+    if not st.session_state.has_started and not st.session_state.is_locked:
+        with st.expander("Need a starting example? (Optional)", expanded=False):
+            cols = st.columns(3)
+            for i in range(3):
+                with cols[i]:
+                    st.button(
+                        f"Use example {i+1}", key=f"initial_ex_{i}",
+                        on_click=prefill_composer, args=(INITIAL_EXAMPLES[i],),
+                    )
+                    st.caption(INITIAL_EXAMPLES[i])
+
+    # Alternative statements — only once all three elements are in
+    if st.session_state.strategy_state.get("current_phase") == "strategy_statement" and not st.session_state.is_locked:
+        n_drafts = min(numeric_setting("MULTI_DRAFT_COUNT", 3, int), MAX_DRAFTS)
+        budget = budget_status()[0]
+        if st.button(
+            f"Compare {n_drafts} alternative statements",
+            key="gen_drafts",
+            disabled=budget in (BUDGET_SHORT, BUDGET_STOPPED),
+        ):
+            try:
+                with st.spinner("Drafting alternatives…"), profiler.span("multi_draft"):
+                    candidates, failed = generate_alternative_drafts(
+                        st.session_state.prompt_version, st.session_state.strategy_state, n_drafts, budget
+                    )
+                st.session_state.draft_candidates = candidates
+                st.session_state.last_error = ""
+                if failed:
+                    st.warning(f"{failed} of {n_drafts} alternatives couldn't be generated; showing the rest.")
+            except Exception as e:
+                st.session_state.last_error = str(e)
+                st.error(f"Couldn't generate alternatives: {e}")
+
+        candidates = current_draft_candidates()
+        if candidates:
+            cols = st.columns(len(candidates))
+            for i, (col, cand) in enumerate(zip(cols, candidates)):
+                with col:
+                    st.markdown(f"**{EMPHASIS_LABELS.get(cand['emphasis'], cand['emphasis'])}**")
+                    st.write(cand["draft"])
+                    if cand["refined"]:
+                        st.caption(cand["refined"])
+                    if st.button("Use this one", key=f"use_draft_{i}"):
+                        choose_draft(cand)
+
+    # Quick actions — they only prefill the message box, so they rerun this fragment alone
+    if st.session_state.has_started and not st.session_state.is_locked:
+        with st.expander("Reopen a component", expanded=False):
+            st.caption(
+                "“Revise scope: …” asks Marvin to rework it with you. "
+                "“Set scope to …” replaces it exactly as you type it."
+            )
+            qa_cols = st.columns(4)
+            for col, component in zip(qa_cols[:3], ("objective", "scope", "advantage")):
+                with col:
+                    st.button(
+                        f"Revise {component}", key=f"revise_{component}", use_container_width=True,
+                        on_click=prefill_composer, args=(f"Revise {component}: ",),
+                    )
+            with qa_cols[3]:
+                st.button("Clear input", key="clear_input", use_container_width=True, on_click=prefill_composer, args=("",))
+
+    # Step indicator + Reset — sits just above the message box
+    _phase = st.session_state.strategy_state.get("current_phase", "objective") or "objective"
+    _phase_idx = DISPLAY_PHASES.index(_phase) + 1 if _phase in DISPLAY_PHASES else 1
+    _phase_label = PHASE_LABELS.get(_phase, "Objective")
+    _ind_col, _reset_col = st.columns([5, 1])
+    with _ind_col:
+        st.markdown(
+            f'<div style="font-size:0.78rem;color:var(--muted);margin-bottom:4px;line-height:32px;">'
+            f'Step {_phase_idx} of {len(PHASES)} &nbsp;—&nbsp; <strong style="color:var(--brand);">{_phase_label}</strong>'
+            f'</div>',
+            unsafe_allow_html=True,
+        )
+    with _reset_col:
+        if st.button(
+            "↺ Reset",
+            help="Clears the entire conversation and starts again from Step 1.",
+            key="reset_main",
+            use_container_width=True,
+        ):
+            reset_session()
+
+    # Composer
+    # Critical: clear_on_submit=True so we don't mutate st.session_state["composer_text"] after widget instantiation
+    with st.form("composer_form", clear_on_submit=True):
+        composer = st.text_area(
+            "Message",
+            key="composer_text",
+            placeholder="Type your message…",
+            height=120,
+            disabled=st.session_state.is_locked,
+        )
+        send = st.form_submit_button("Send", type="primary", disabled=st.session_state.is_locked)
+
+    if st.session_state.is_locked:
+        st.info("Session complete. Use Reset to start again.")
+
+    # Send logic
+    if send and composer.strip() and not st.session_state.is_locked:
+        user_text = composer.strip()
+
+        # Large pastes: the model reads the full text on this turn only; chat keeps the digest for
+        # later turns and a short preview for the transcript
+        digest = None
+        pasted = user_text
+        if is_large(user_text):
+            with profiler.span("ingest"):
+                digest = build_digest(user_text)
+            user_text = digest.text
+            apply_orientation(digest.orientation)
+
+        intent = None if digest else classify_intent(user_text)
+
+        # Lock flow after commitment question
+        if st.session_state.assistant_asked_commitment and intent is not None and intent.kind == AFFIRM:
+            st.session_state.is_locked = True
+            st.session_state.chat.append({"role": "user", "content": user_text})
+            st.session_state.chat.append({"role": "assistant", "content": "Good. Then it’s about focus and follow-through."})
+            st.session_state.assistant_asked_commitment = False
+            if st.session_state.final_strategy:
+                # Rendered on a background worker; the download panel picks it up when ready
+                fields = card_fields(st.session_state.final_strategy, st.session_state.strategy_state)
+                request_card(fields)
+                register_card(cohort_id(), st.session_state.session_id, fields)
+            invalidate()
+
+        # Control messages are answered locally; a plain "yes" and scoped revisions still go to the model
+        revising = intent is not None and intent.kind == REVISE
+        if intent is not None and intent.kind not in (AFFIRM, REVISE):
+            handle_local_intent(intent, user_text)
+
+        if digest:
+            st.session_state.chat.append({"role": "user", "content": user_text, "preview": digest.preview})
+        else:
+            st.session_state.chat.append({"role": "user", "content": user_text})
+        st.session_state.has_started = True
 
-# Send logic
-if send and composer.strip() and not st.session_state.is_locked:
-    user_text = composer.strip()
+        budget, _session_used, _cohort_used = budget_status()
+        if budget == BUDGET_STOPPED:
+            st.session_state.chat.append({"role": "assistant", "content": BUDGET_STOP_MESSAGE})
+            invalidate()
 
-    # Lock flow after commitment question
-    if st.session_state.assistant_asked_commitment and is_affirmation(user_text):
-        st.session_state.is_locked = True
-        st.session_state.chat.append({"role": "user", "content": user_text})
-        st.session_state.chat.append({"role": "assistant", "content": "Good. Then it’s about focus and follow-through."})
-        st.session_state.assistant_asked_commitment = False
-        st.rerun()
+        with profiler.span("lint"):
+            if revising:
+                hints = format_hints(lint_message(intent.value, intent.component))
+            else:
+                hints = format_hints(lint_message(user_text, st.session_state.strategy_state.get("current_phase", "")))
+
+        try:
+            if revising:
+                with st.spinner("Marvin is thinking…"), profiler.span("revision_call"):
+                    raw = call_revision(
+                        intent.component,
+                        intent.value,
+                        session_mode=st.session_state.session_mode,
+                        prompt_version=st.session_state.prompt_version,
+                        hints=hints,
+                        budget=budget,
+                    )
+            else:
+                with st.spinner("Marvin is thinking…"), profiler.span("model_call"):
+                    conversation = st.session_state.chat
+                    if digest:
+                        conversation = conversation[:-1] + [{"role": "user", "content": pasted}]
+                    raw = call_model(
+                        conversation,
+                        session_mode=st.session_state.session_mode,
+                        prompt_version=st.session_state.prompt_version,
+                        hints=hints,
+                        budget=budget,
+                    )
+            carried_state = st.session_state.strategy_state
+            user_facing, state = split_user_text_and_state(raw)
+            # split_user_text_and_state falls back to the carried-over state when the reply has none
+            state_in_reply = isinstance(state, dict) and state is not carried_state
+
+            # --- TEMPORARY DEBUG ---
+            start = raw.rfind(STATE_OPEN)
+            end = raw.rfind(STATE_CLOSE)
+            raw_blob = raw[start + len(STATE_OPEN): end].strip() if (start != -1 and end != -1) else "(STATE_JSON not found)"
+            print("\n--- DEBUG STATE_JSON ---")
+            print(raw_blob)
+            print("--- END STATE_JSON ---\n")
+            # --- END DEBUG ---
+
+            st.session_state.chat.append({"role": "assistant", "content": user_facing})
+            if not st.session_state.get("first_reply_timed"):
+                # From the first rerun past the gate, so the deferred imports are in it
+                st.session_state.first_reply_timed = True
+                startup_metrics.record(TIME_TO_FIRST_REPLY, time.perf_counter() - st.session_state.post_gate_started)
+                profiler.mark(TIME_TO_FIRST_REPLY)
+
+            if isinstance(state, dict):
+                if revising:
+                    # Only the revised component (and the drafts built on it) come from the reply
+                    state = merge_revision(st.session_state.strategy_state, state, intent.component, PHASES)
+                with profiler.span("normalise_state"):
+                    st.session_state.strategy_state = normalise_state(state)
+                st.session_state.state_history.record(
+                    st.session_state.strategy_state,
+                    label=f"revise {intent.component}" if revising else st.session_state.strategy_state["current_phase"],
+                )
+
+                final_strategy = final_strategy_from_state(st.session_state.strategy_state)
+                if final_strategy:
+                    st.session_state.final_strategy = final_strategy
+
+            # Read from this reply's structured state, not from the wording or a carried-over state
+            st.session_state.assistant_asked_commitment = state_in_reply and asked_commitment(
+                st.session_state.strategy_state, COMMITMENT_QUESTION
+            )
 
-    st.session_state.chat.append({"role": "user", "content": user_text})
-    st.session_state.has_started = True
+            st.session_state.last_error = ""
+            invalidate()
 
-    try:
-        with st.spinner("Marvin is thinking…"):
-            raw = call_model(st.session_state.chat, session_mode=session_mode)
-        user_facing, state = split_user_text_and_state(raw)
-
-        # --- TEMPORARY DEBUG ---
-        start = raw.rfind(STATE_OPEN)
-        end = raw.rfind(STATE_CLOSE)
-        raw_blob = raw[start + len(STATE_OPEN): end].strip() if (start != -1 and end != -1) else "(STATE_JSON not found)"
-        print("\n--- DEBUG STATE_JSON ---")
-        print(raw_blob)
-        print("--- END STATE_JSON ---\n")
-        # --- END DEBUG ---
-
-        st.session_state.chat.append({"role": "assistant", "content": user_facing})
-        st.session_state.assistant_asked_commitment = (COMMITMENT_QUESTION in user_facing)
-
-        if isinstance(state, dict):
-            st.session_state.strategy_state = normalise_state(state)
-
-            draft_stmt = (state.get("draft_statement") or "").strip()
-            refined_stmt = (state.get("refined_statement") or "").strip()
-            assumptions = state.get("strategic_assumptions") or []
-
-            if draft_stmt or refined_stmt:
-                st.session_state.final_strategy = {
-                    "draft": draft_stmt,
-                    "refined": refined_stmt,
-                    "assumptions": assumptions[:5],
-                }
-
-        st.session_state.last_error = ""
-        st.rerun()
+        except Exception as e:
+            st.session_state.last_error = str(e)
+            st.session_state.chat.append({"role": "assistant", "content": f"Error calling the model: {str(e)}"})
+            invalidate()
 
-    except Exception as e:
-        st.session_state.last_error = str(e)
-        st.session_state.chat.append({"role": "assistant", "content": f"Error calling the model: {str(e)}"})
-        st.rerun()
+
+with st.sidebar:
+    render_sidebar()
+
+render_tracker()
+
+# Visual aids — right-hand panel from the Scope step on, loaded on first use
+with profiler.span("visual_aid"):
+    aid = aid_for_state(st.session_state.strategy_state)
+if aid is not None and st.toggle("Show visual aid", value=True, key="show_visual_aid"):
+    transcript_col, aid_col = st.columns([3, 2])
+    with transcript_col:
+        render_transcript()
+    with aid_col:
+        render_visual_aid(aid)
+else:
+    render_transcript()
+
+render_composer()
+
+# Strategy card — rendered off the request path once the session locks
+if st.session_state.is_locked and st.session_state.final_strategy:
+    card = card_fields(st.session_state.final_strategy, st.session_state.strategy_state)
+    _card_key, card_job = request_card(card)
+    card_pending = not card_job.done()
+    st.fragment(run_every=1.0 if card_pending else None)(render_card_downloads)(card, card_pending)
 
 # Version label — subtle, bottom right
 st.markdown(
     f'<div style="text-align:right;color:#C0C8D0;font-size:0.72rem;margin-top:2rem;padding-bottom:0.5rem;">'
-    f'UI {APP_VERSION} &nbsp;·&nbsp; Prompt {get_prompt_version()}'
+    f'UI {APP_VERSION} &nbsp;·&nbsp; Prompt {prompt_label(st.session_state.prompt_version)}'
     f'</div>',
     unsafe_allow_html=True,
-)
\ No newline at end of file
+)
+
+# Rerun trace — hidden unless COACH_PROFILE is set
+profiler.end()
+if profiler.enabled:
+    with st.expander("Rerun trace (debug)", expanded=False):
+        traces = profiler.completed()
+        if not traces:
+            st.caption("No completed reruns yet.")
+        else:
+            trace_idx = st.selectbox(
+                "Rerun",
+                options=list(range(len(traces))),
+                index=len(traces) - 1,
+                format_func=lambda i: f"{i + 1}. {traces[i].label} — {traces[i].duration_ms:.1f} ms",
+            )
+            trace = traces[trace_idx]
+            st.table(trace.rows())
+            st.download_button(
+                "Download Chrome trace",
+                data=chrome_trace_json(trace),
+                file_name=f"rerun-trace-{trace_idx + 1}.json",
+                mime="application/json",
+            )
+        st.caption("Model call policy (this worker)")
+        st.json(get_policy().metrics.snapshot())
+        st.caption("Cold start (this worker)")
+        st.json(startup_metrics.snapshot())
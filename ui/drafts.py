@@ -0,0 +1,107 @@
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+# ------------------------------------------------------------
+# Parallel alternative drafts (strategy_statement phase)
+#
+# Each candidate is one compact model call built from the current
+# strategy_state, leaning on a different element. Each request gets its own
+# pool with one thread per candidate, so the calls run concurrently however
+# many participants ask at once, and N candidates take about as long as the
+# slowest one. N is capped at the number of distinct emphases.
+#
+# Candidates carry the basis (a hash of the fields they were built from),
+# so once the state moves on - a new turn, an undo, a revision - they no
+# longer match and are not offered.
+# ------------------------------------------------------------
+
+EMPHASES = {
+    "objective": "Lead with the Objective: make the number and the timeframe unmistakable.",
+    "scope": "Lead with the Scope: be sharp about exactly which customers and offer, and what's excluded.",
+    "advantage": "Lead with the Advantage: make it obvious why customers choose this business and why it's hard to copy.",
+    "balanced": "Give Objective, Scope and Advantage equal weight.",
+}
+EMPHASIS_LABELS = {
+    "objective": "Objective-led",
+    "scope": "Scope-led",
+    "advantage": "Advantage-led",
+    "balanced": "Balanced",
+}
+
+DRAFT_INSTRUCTIONS = (
+    "\n\nYou are now writing ONE alternative Strategy Statement for the owner to compare "
+    "side by side with others. Do not ask a question. Do not add any preamble, and do not "
+    "append a STATE_JSON block. Reply with exactly:\n\n"
+    "Draft:\n[the draft statement]\n\n"
+    "Refined:\n[the refined statement]"
+)
+
+_DRAFT_RE = re.compile(r"Draft:\s*(?P<draft>.*?)\s*(?:Refined:\s*(?P<refined>.*))?$", re.IGNORECASE | re.DOTALL)
+
+MAX_DRAFTS = len(EMPHASES)
+
+
+def pick_emphases(n: int) -> List[str]:
+    order = ["objective", "scope", "advantage", "balanced"]
+    return order[: max(1, min(n, MAX_DRAFTS))]
+
+
+def build_draft_request(state: dict, emphasis: str) -> str:
+    assumptions = "; ".join(state.get("strategic_assumptions") or []) or "—"
+    return (
+        f"Business: {state.get('business_type') or '—'} / {state.get('industry') or '—'} / "
+        f"team {state.get('team_size') or '—'}\n"
+        f"Objective: {state.get('objective') or '—'}\n"
+        f"Scope: {state.get('scope') or '—'}\n"
+        f"Advantage: {state.get('advantage') or '—'}\n"
+        f"Assumptions: {assumptions}\n"
+        f"Current draft: {state.get('refined_statement') or state.get('draft_statement') or '—'}\n\n"
+        f"{EMPHASES[emphasis]}"
+    )
+
+
+def draft_basis(state: dict) -> str:
+    return hashlib.sha1(build_draft_request(state, "balanced").encode("utf-8")).hexdigest()
+
+
+def parse_candidate(text: str) -> dict:
+    m = _DRAFT_RE.search((text or "").strip())
+    if not m:
+        return {"draft": (text or "").strip(), "refined": ""}
+    return {"draft": m.group("draft").strip(), "refined": (m.group("refined") or "").strip()}
+
+
+def generate_drafts(
+    send: Callable[[str, List[dict]], str],
+    system_prompt: str,
+    state: dict,
+    n: int = 3,
+) -> Tuple[List[dict], int]:
+    """Generate up to n candidates concurrently: (candidates, number that failed).
+
+    `send(system, messages)` returns the reply text.
+    """
+    system = f"{system_prompt}{DRAFT_INSTRUCTIONS}"
+    basis = draft_basis(state)
+
+    def one(emphasis: str) -> dict:
+        reply = send(system, [{"role": "user", "content": build_draft_request(state, emphasis)}])
+        return {"emphasis": emphasis, "basis": basis, **parse_candidate(reply)}
+
+    emphases = pick_emphases(n)
+    # Per-request pool: each draft blocks on a call that itself runs in the model-call pool
+    with ThreadPoolExecutor(max_workers=len(emphases), thread_name_prefix="draft") as pool:
+        futures = [pool.submit(one, e) for e in emphases]
+        candidates, failed = [], 0
+        for fut in futures:
+            try:
+                candidates.append(fut.result())
+            except Exception:
+                # One failed candidate shouldn't sink the others
+                failed += 1
+    if not candidates:
+        # Surface the first error if every candidate failed
+        futures[0].result()
+    return candidates, failed
@@ -0,0 +1,195 @@
+import re
+from typing import Dict, List, NamedTuple
+
+# ------------------------------------------------------------
+# Large paste ingest
+#
+# A business plan pasted into the composer would otherwise sit in chat and
+# be resent on every later turn. The model reads the full paste once, on the
+# turn it arrives; large inputs are also chunked and digested locally:
+# orientation fields (business_type, industry, team_size) are pulled out by
+# pattern, and the most fact-dense sentences are kept. Chat keeps the digest
+# for later turns and a short preview for the transcript, never the paste
+# itself, so per-turn input and stored sessions stay flat however big it was.
+# ------------------------------------------------------------
+
+LARGE_INPUT_CHARS = 4000
+CHUNK_CHARS = 2000
+MAX_FACTS = 12
+MAX_FACT_CHARS = 220
+NOTE_CHARS = 300
+PREVIEW_CHARS = 600
+
+_B2B_RE = re.compile(
+    r"\b(?:b2b|business[-\s]to[-\s]business|(?:our|we)\s+(?:clients|customers)\s+are\s+(?:businesses|companies|firms)|"
+    r"commercial\s+clients|enterprise\s+clients|wholesale|trade\s+customers)\b",
+    re.IGNORECASE,
+)
+_B2C_RE = re.compile(
+    r"\b(?:b2c|business[-\s]to[-\s]consumer|direct\s+to\s+consumers?|retail\s+customers|homeowners|"
+    r"households|patients|consumers|members\s+of\s+the\s+public)\b",
+    re.IGNORECASE,
+)
+_TEAM_RE = re.compile(
+    r"\b(?P<n>\d{1,5})\s*(?:full[-\s]time\s+|part[-\s]time\s+|fte\s+)?(?:staff|employees|people|team\s+members|fte|workers|engineers|technicians)\b"
+    r"|\bteam\s+of\s+(?P<n2>\d{1,5})\b"
+    r"|\bheadcount\s+(?:of\s+)?(?P<n3>\d{1,5})\b",
+    re.IGNORECASE,
+)
+_INDUSTRY_RE = re.compile(
+    r"\b(?:we\s+are|we're|i\s+run|we\s+run)\s+(?:an?|the)\s+(?P<industry>[a-z][a-z\s&-]{2,40}?)\s+"
+    r"(?:business|company|firm|practice|consultancy|agency|studio|clinic|shop|provider|manufacturer)\b",
+    re.IGNORECASE,
+)
+# Sentences about where the business is heading, not where it is now
+_GOAL_RE = re.compile(
+    r"\b(?:reach|grow(?:ing)?\s+to|scale\s+to|expand\s+to|hire|hiring|recruit|target|goal|aim|ambition|"
+    r"plan(?:s|ning)?\s+to|will\s+(?:have|be|employ)|by\s+(?:19|20)\d\d|by\s+the\s+end\s+of|within\s+\d+\s+years?)\b",
+    re.IGNORECASE,
+)
+_INDUSTRY_LABEL_RE = re.compile(r"^\s*(?:industry|sector)\s*[:\-]\s*(?P<industry>.{2,60})$", re.IGNORECASE | re.MULTILINE)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_BULLET_RE = re.compile(r"^(?:[-*•·]|\d{1,2}[.)])\s+")
+_NUMBER_RE = re.compile(r"[$£€]\s*\d|\d[\d,.]*\s*(?:%|k\b|m\b|million|billion)|\b\d[\d,.]*\b")
+_KEYWORDS = re.compile(
+    r"\b(?:revenue|turnover|profit|margin|customers?|clients?|goal|target|objective|grow(?:th)?|"
+    r"competitors?|market|pricing|price|staff|employees|services?|products?|strategy|plan|"
+    r"advantage|unique|differen\w+|niche|segment|exclude|focus)\b",
+    re.IGNORECASE,
+)
+
+
+class Digest(NamedTuple):
+    orientation: Dict[str, str]
+    facts: List[str]
+    chars_in: int
+    chunks: int
+    text: str
+    preview: str
+
+
+def is_large(text: str) -> bool:
+    return len(text or "") >= LARGE_INPUT_CHARS
+
+
+def _split_paragraph(para: str, size: int) -> List[str]:
+    """An oversized paragraph packed into sentence-aligned pieces (a single longer sentence stays whole)."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END_RE.split(para):
+        if current and len(current) + len(sentence) + 1 > size:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS) -> List[str]:
+    """Paragraph-aligned chunks of roughly `size` characters, in document order."""
+    chunks, current = [], ""
+    for para in re.split(r"\n\s*\n", text or ""):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) > size:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks += _split_paragraph(para, size)
+            continue
+        if current and len(current) + len(para) + 2 > size:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def extract_orientation(text: str) -> Dict[str, str]:
+    out = {}
+    b2b, b2c = len(_B2B_RE.findall(text)), len(_B2C_RE.findall(text))
+    if b2b or b2c:
+        out["business_type"] = "b2b" if b2b >= b2c else "b2c"
+    m = _INDUSTRY_LABEL_RE.search(text) or _INDUSTRY_RE.search(text)
+    if m:
+        out["industry"] = " ".join(m.group("industry").split()).strip(" .")
+    for sentence in _SENTENCE_RE.split(text):
+        if _GOAL_RE.search(sentence):
+            continue
+        m = _TEAM_RE.search(sentence)
+        if m:
+            n = m.group("n") or m.group("n2") or m.group("n3")
+            if int(n) > 0:
+                out["team_size"] = n
+                break
+    return out
+
+
+def _score_sentence(sentence: str) -> int:
+    score = 2 if _NUMBER_RE.search(sentence) else 0
+    score += min(3, len(_KEYWORDS.findall(sentence)))
+    return score
+
+
+def extract_key_facts(chunks: List[str], limit: int = MAX_FACTS) -> List[str]:
+    scored, seen = [], set()
+    order = 0
+    for chunk in chunks:
+        for sentence in _SENTENCE_RE.split(chunk):
+            sentence = _BULLET_RE.sub("", " ".join(sentence.split()))
+            if len(sentence) < 25:
+                continue
+            key = sentence.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            score = _score_sentence(sentence)
+            if score >= 2:
+                if len(sentence) > MAX_FACT_CHARS:
+                    sentence = sentence[: MAX_FACT_CHARS - 1].rstrip() + "…"
+                scored.append((score, order, sentence))
+                order += 1
+    best = sorted(scored, key=lambda s: (-s[0], s[1]))[:limit]
+    # Back in document order so the digest reads naturally
+    return [s for _score, _order, s in sorted(best, key=lambda s: s[1])]
+
+
+def _clip(text: str, n: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= n else text[: n - 1].rstrip() + "…"
+
+
+def paste_preview(text: str, n: int = PREVIEW_CHARS) -> str:
+    """The start of the paste as typed, and how much more there was."""
+    text = (text or "").strip()
+    if len(text) <= n:
+        return text
+    head = text[:n].rsplit(None, 1)[0] if " " in text[:n] else text[:n]
+    return f"{head.rstrip()} …\n\n[{len(text) - len(head):,} more characters, summarised for Marvin]"
+
+
+def build_digest(text: str) -> Digest:
+    chunks = chunk_text(text)
+    orientation = extract_orientation(text)
+    facts = extract_key_facts(chunks)
+
+    lines = [f"[Pasted document: {len(text):,} characters in {len(chunks)} parts, summarised locally]"]
+    if chunks:
+        lines.append(f"Opening: {_clip(chunks[0], NOTE_CHARS)}")
+    if orientation:
+        lines.append(
+            "Context: " + "; ".join(f"{k.replace('_', ' ')} = {v}" for k, v in orientation.items())
+        )
+    if facts:
+        lines.append("Key points:")
+        lines += [f"- {f}" for f in facts]
+    if len(chunks) > 1:
+        last_para = re.split(r"\n\s*\n", chunks[-1])[-1]
+        lines.append(f"Closing: {_clip(last_para, NOTE_CHARS)}")
+    return Digest(orientation, facts, len(text), len(chunks), "\n".join(lines), paste_preview(text))
@@ -0,0 +1,78 @@
+import re
+from typing import NamedTuple, Optional
+
+# ------------------------------------------------------------
+# Local intent fast-path
+#
+# Control messages ("reset", "undo", "show my statement", "yes" after the
+# commitment question, "set scope to ...") are recognised here with one
+# compiled pattern and handled without a model round trip. The verb decides
+# what happens to a component: "set"/"change scope to ..." replaces it as
+# typed, while "revise scope: ..." or "revise scope to ..." (the Revise
+# buttons' prefill) goes to the model as a scoped revision turn. Anything
+# that doesn't match goes to the model as before.
+# ------------------------------------------------------------
+
+AFFIRM = "affirm"
+RESET = "reset"
+UNDO = "undo"
+SHOW_STATEMENT = "show_statement"
+SET_COMPONENT = "set_component"
+REVISE = "revise"
+
+COMPONENTS = ("objective", "scope", "advantage")
+
+_INTENT_RE = re.compile(
+    r"""^\s*(?:
+        (?P<affirm>yes|yep|yeah|yeh|absolutely|i\s+am|we\s+are|ok|okay|sure|let'?s\s+do\s+it)
+      | (?P<reset>reset|start\s+(?:again|over)|restart)
+      | (?P<undo>undo)
+      | (?P<show>show\s+(?:me\s+)?(?:my|the)\s+(?:strategy(?:\s+statement)?|statement|working\s+strategy))
+      | (?:change|set)\s+(?:my\s+|the\s+)?(?P<component>objective|scope|advantage)
+        \s+(?:to|=)\s+(?P<value>\S.*?)
+      | revise\s+(?:my\s+|the\s+)?(?P<revise>objective|scope|advantage)
+        (?:\s*:|\s+to\b\s*:?|\s*=)\s*(?P<revision>\S.*?)
+    )\s*[.!]*\s*$""",
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+
+_QUESTION_NORMALISE_RE = re.compile(r"[^a-z ]+")
+
+
+class Intent(NamedTuple):
+    kind: str
+    component: str = ""
+    value: str = ""
+
+
+def classify_intent(text: str) -> Optional[Intent]:
+    m = _INTENT_RE.match(text or "")
+    if not m:
+        return None
+    if m.group("affirm"):
+        return Intent(AFFIRM)
+    if m.group("reset"):
+        return Intent(RESET)
+    if m.group("undo"):
+        return Intent(UNDO)
+    if m.group("show"):
+        return Intent(SHOW_STATEMENT)
+    if m.group("revise"):
+        return Intent(REVISE, m.group("revise").lower(), m.group("revision").strip())
+    return Intent(SET_COMPONENT, m.group("component").lower(), m.group("value").strip())
+
+
+def _normalise_question(text: str) -> str:
+    return " ".join(_QUESTION_NORMALISE_RE.sub(" ", (text or "").lower()).split())
+
+
+def asked_commitment(state: Optional[dict], commitment_question: str) -> bool:
+    """True when the model's STATE_JSON says the commitment question is pending."""
+    if not state or state.get("current_phase") != "commit":
+        return False
+    if state.get("awaiting_commitment") is True:
+        return True
+    # Otherwise an explicit match only: an empty next_question (e.g. after "What's making
+    # you pause?") must not let a plain "ok" lock the session
+    next_question = _normalise_question(state.get("next_question", ""))
+    return bool(next_question) and _normalise_question(commitment_question) in next_question
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, TypeVar
+
+# ------------------------------------------------------------
+# Local SQLite files
+#
+# The token ledger, the strategy-card registry and the SQLite session store
+# each keep a small file under data/, shared by every worker on the host.
+# Connections are short-lived (one per operation): callers include
+# background model-call threads, and SQLite connections don't travel
+# between threads.
+#
+# Each of them is also a process-wide singleton per path (or store spec);
+# SharedInstances holds those.
+# ------------------------------------------------------------
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+T = TypeVar("T")
+
+
+def data_path(name: str) -> str:
+    return os.path.join(DATA_DIR, name)
+
+
+class SQLiteFile:
+    """Base for the classes backed by one local SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+class SharedInstances(Generic[T]):
+    """One instance per key (a path or store spec), created on first use."""
+
+    def __init__(self, factory: Callable[[str], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._instances: Dict[str, T] = {}
+
+    def get(self, key: str) -> T:
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = self._factory(key)
+            return self._instances[key]
@@ -0,0 +1,413 @@
+import re
+
+# ------------------------------------------------------------
+# Static page assets
+#
+# The stylesheet and the fixed header/intro markup never change, so they
+# are built once per process, when this module is first imported, rather
+# than on every rerun of the script. Whitespace is collapsed, which keeps
+# the per-rerun payload smaller and stops indented HTML from being read
+# as a Markdown code block.
+# ------------------------------------------------------------
+
+
+def _compact(markup: str) -> str:
+    return re.sub(r"\s+", " ", markup).strip()
+
+
+# Centre-inspired: clean, blue, lots of whitespace
+_CSS = """
+<style>
+  @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
+
+  :root{
+    --brand:#003366;
+    --brand-mid:#0B63B6;
+    --brand-dark:#002244;
+    --ink:#0B1220;
+    --muted:#5B6B7A;
+    --bg:#FFFFFF;
+    --card:#F4F7FB;
+    --border:#DDE5EF;
+    --accent:#E8F0FA;
+  }
+
+  html, body, [class*="css"] {
+    font-family: 'Inter', sans-serif;
+  }
+
+  /* Keep Streamlit toolbar visible but hide the bar background */
+  #MainMenu {visibility: hidden;}
+  footer {visibility: hidden;}
+  header[data-testid="stHeader"] {
+    background: transparent !important;
+    box-shadow: none !important;
+  }
+
+  div[data-testid="stToolbar"]{
+    opacity: 0.25;
+    transition: opacity 120ms ease-in-out;
+  }
+  div[data-testid="stToolbar"]:hover{ opacity: 1; }
+
+  /* Push content down to clear the CBG header + sticky progress bar */
+  .block-container {
+    padding-top: 0rem !important;
+    padding-left: 1rem !important;
+    padding-right: 1rem !important;
+    max-width: 860px;
+  }
+
+  /* Full-bleed header */
+  .cbg-header-wrap {
+    margin: -1rem -1rem 2rem -1rem;
+  }
+
+  /* Brand header bar — square/blocky per Centre CI */
+  .cbg-header {
+    background: var(--brand);
+    color: white;
+    padding: 14px 36px;
+    display: flex;
+    align-items: center;
+    gap: 24px;
+    border-radius: 0;
+  }
+  .cbg-header .org {
+    font-size: 0.70rem;
+    font-weight: 500;
+    opacity: 0.65;
+    letter-spacing: 0.09em;
+    text-transform: uppercase;
+    line-height: 1;
+    margin-bottom: 5px;
+  }
+  .cbg-header .tool {
+    font-size: 1.1rem;
+    font-weight: 700;
+    line-height: 1.2;
+    letter-spacing: -0.01em;
+    color: white;
+  }
+  .cbg-header .hdr-divider {
+    width: 1px;
+    height: 38px;
+    background: rgba(255,255,255,0.22);
+    flex-shrink: 0;
+  }
+  .cbg-header .tagline {
+    font-size: 0.80rem;
+    opacity: 0.55;
+    margin-top: 4px;
+    font-style: italic;
+  }
+
+  /* Centre wordmark SVG */
+  .cbg-wordmark {
+    width: 140px;
+    height: 48px;
+    flex-shrink: 0;
+  }
+
+  /* Hero intro */
+  .hero-intro {
+    text-align: center;
+    padding: 0.5rem 0 1.5rem 0;
+  }
+  .hero-intro h2 {
+    font-size: 1.65rem;
+    font-weight: 700;
+    color: var(--ink);
+    letter-spacing: -0.02em;
+    margin-bottom: 0.6rem;
+  }
+  .hero-intro p {
+    font-size: 1rem;
+    color: var(--muted);
+    line-height: 1.65;
+    max-width: 580px;
+    margin: 0 auto;
+  }
+
+  /* Intro card — square corners per Centre CI */
+  .intro-card {
+    background: var(--card);
+    border: 1px solid var(--border);
+    border-left: 4px solid var(--brand-mid);
+    border-radius: 0;
+    padding: 20px 24px;
+    margin: 0 0 10px 0;
+  }
+  .intro-card .card-title {
+    font-size: 0.82rem;
+    font-weight: 700;
+    text-transform: uppercase;
+    letter-spacing: 0.07em;
+    color: var(--brand-mid);
+    margin-bottom: 10px;
+  }
+  .intro-card p {
+    font-size: 0.96rem;
+    color: var(--ink);
+    line-height: 1.6;
+    margin: 0 0 10px 0;
+  }
+  .intro-card p:last-child { margin-bottom: 0; }
+
+  /* Step progress indicator */
+  .step-progress {
+    display: flex;
+    align-items: center;
+    margin: 24px 0 20px 0;
+    padding: 0 4px;
+  }
+  .step-item {
+    display: flex;
+    flex-direction: column;
+    align-items: center;
+    position: relative;
+    flex: 1;
+  }
+  /* Connecting line between steps */
+  .step-item:not(:last-child)::after {
+    content: '';
+    position: absolute;
+    top: 14px;
+    left: calc(50% + 14px);
+    right: calc(-50% + 14px);
+    height: 2px;
+    background: var(--border);
+    z-index: 0;
+  }
+  .step-item.done:not(:last-child)::after {
+    background: var(--brand-mid);
+  }
+  /* Step circle */
+  .step-circle {
+    width: 28px;
+    height: 28px;
+    border-radius: 50%;
+    border: 2px solid var(--border);
+    background: white;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 0.72rem;
+    font-weight: 700;
+    color: var(--muted);
+    position: relative;
+    z-index: 1;
+    flex-shrink: 0;
+  }
+  .step-item.current .step-circle {
+    border-color: var(--brand);
+    background: var(--brand);
+    color: white;
+  }
+  .step-item.done .step-circle {
+    border-color: var(--brand-mid);
+    background: var(--brand-mid);
+    color: white;
+  }
+  /* Tick for done */
+  .step-item.done .step-circle::after {
+    content: '✓';
+    font-size: 0.75rem;
+    font-weight: 700;
+  }
+  /* Step label */
+  .step-label {
+    margin-top: 6px;
+    font-size: 0.72rem;
+    font-weight: 500;
+    color: var(--muted);
+    text-align: center;
+    letter-spacing: 0.02em;
+    white-space: nowrap;
+  }
+  .step-item.current .step-label {
+    color: var(--brand);
+    font-weight: 700;
+  }
+  .step-item.done .step-label {
+    color: var(--brand-mid);
+  }
+
+  /* Chat bubbles — square */
+  [data-testid="stChatMessage"] {
+    border-radius: 3px;
+    padding: 4px 0;
+  }
+
+  /* Buttons — square, brand blue */
+  .stButton>button {
+    border-radius: 3px;
+    font-size: 0.88rem;
+    padding: 0.45rem 0.9rem;
+    border: 1.5px solid var(--border);
+    font-weight: 500;
+  }
+  .stButton>button:hover {
+    border-color: var(--brand-mid);
+    color: var(--brand-mid);
+  }
+
+  /* Reset button — compact, muted, right-aligned with message box */
+  [data-testid="stMain"] [data-testid="stHorizontalBlock"] > [data-testid="stColumn"]:last-child .stButton > button {
+    padding: 0.1rem 0.5rem !important;
+    font-size: 0.73rem !important;
+    font-weight: 400 !important;
+    color: var(--muted) !important;
+    border-color: var(--border) !important;
+    width: 100%;
+  }
+  [data-testid="stMain"] [data-testid="stHorizontalBlock"] > [data-testid="stColumn"]:last-child .stButton > button:hover {
+    color: var(--brand-mid) !important;
+    border-color: var(--brand-mid) !important;
+  }
+
+  /* Send button — square, navy, not red */
+  div[data-testid="stForm"] button[kind="primary"],
+  button[kind="primary"],
+  .stFormSubmitButton button {
+    background: var(--brand) !important;
+    border-color: var(--brand) !important;
+    border-radius: 3px !important;
+    font-weight: 600 !important;
+    letter-spacing: 0.02em !important;
+    color: white !important;
+  }
+  div[data-testid="stForm"] button[kind="primary"]:hover,
+  .stFormSubmitButton button:hover {
+    background: var(--brand-dark) !important;
+    border-color: var(--brand-dark) !important;
+  }
+
+  section[data-testid="stSidebar"] {
+    border-right: 1px solid var(--border);
+  }
+
+  /* Always show the sidebar collapse (<<) button — not just on hover */
+  [data-testid="stSidebarCollapseButton"] {
+    position: fixed !important;
+    top: 1rem !important;
+    z-index: 999 !important;
+  }
+  [data-testid="stSidebarCollapseButton"] button {
+    opacity: 1 !important;
+  }
+
+  /* Agent-style conversation transcript — single column, no bubbles */
+  .chat-feed {
+    display: flex;
+    flex-direction: column;
+    gap: 0;
+    margin: 8px 0 16px 0;
+  }
+  /* Each exchange = one Marvin turn + optional user reply */
+  .chat-exchange {
+    border-bottom: 1px solid var(--border);
+    padding: 20px 0;
+  }
+  .chat-exchange:last-child {
+    border-bottom: none;
+  }
+  /* Marvin label */
+  .chat-speaker {
+    font-size: 0.72rem;
+    font-weight: 700;
+    text-transform: uppercase;
+    letter-spacing: 0.08em;
+    margin-bottom: 6px;
+  }
+  .chat-speaker.marvin {
+    color: var(--brand);
+  }
+  .chat-speaker.user {
+    color: var(--muted);
+  }
+  /* Message text */
+  .chat-text {
+    font-size: 0.97rem;
+    line-height: 1.7;
+    color: var(--ink);
+  }
+  .chat-text.marvin-text {
+    color: var(--ink);
+  }
+  .chat-text.user-text {
+    color: #4B5563;
+    font-style: italic;
+    padding-left: 14px;
+    border-left: 2px solid #C5D8EA;
+    margin-top: 14px;
+  }
+
+  /* Visual aids panel */
+  .visual-aid {
+    background: var(--card);
+    border: 1px solid var(--border);
+    border-top: 3px solid var(--brand-mid);
+    padding: 14px 16px;
+    margin-top: 8px;
+  }
+  .visual-aid .card-title {
+    font-size: 0.78rem;
+    font-weight: 700;
+    text-transform: uppercase;
+    letter-spacing: 0.07em;
+    color: var(--brand-mid);
+    margin-bottom: 10px;
+  }
+  .visual-aid p {
+    font-size: 0.85rem;
+    color: var(--muted);
+    line-height: 1.5;
+    margin: 10px 0 0 0;
+  }
+
+</style>
+"""
+
+# Header bar — shown on ALL screens including login
+_HEADER = """
+<div class="cbg-header-wrap">
+  <div class="cbg-header">
+    <svg class="cbg-wordmark" viewBox="0 0 140 46" fill="none" xmlns="http://www.w3.org/2000/svg">
+      <text x="0" y="13" font-family="Inter,sans-serif" font-size="8.5" font-weight="500"
+            fill="rgba(255,255,255,0.60)" letter-spacing="0.6">AUSTRALIAN CENTRE FOR</text>
+      <text x="0" y="30" font-family="Inter,sans-serif" font-size="16" font-weight="800"
+            fill="white" letter-spacing="0.1">Business Growth</text>
+      <line x1="0" y1="36" x2="140" y2="36" stroke="rgba(255,255,255,0.18)" stroke-width="0.8"/>
+      <text x="0" y="44" font-family="Inter,sans-serif" font-size="7.5" font-weight="400"
+            fill="rgba(255,255,255,0.45)" letter-spacing="0.3">Adelaide University</text>
+    </svg>
+    <div class="hdr-divider"></div>
+    <div>
+      <div class="tool">Marvin &mdash; Strategy Coach</div>
+      <div class="tagline">Good questions. Clear thinking. A strategy you can actually use.</div>
+    </div>
+  </div>
+</div>
+"""
+
+_HERO = """
+<div class="hero-intro">
+  <h2>Where does your business need to go?</h2>
+  <p>A good strategy isn't a long document. It's a clear answer to three questions: what are you trying to achieve, who are you focused on, and why do customers choose you.</p>
+  <p style="margin-top:0.75rem;">Most leaders know the answer intuitively. Marvin helps you find the words.</p>
+</div>
+"""
+
+_INTRO_CARD = """
+<div class="intro-card">
+  <div class="card-title">What to expect</div>
+  <p>Marvin will ask you a short series of focused questions about your objective, your customers, and what you're genuinely better at than the competition.</p>
+  <p>The conversation takes 10&ndash;15 minutes. At the end, you'll have a clear Strategy Statement &mdash; in plain language &mdash; that you can actually use.</p>
+</div>
+"""
+
+CSS = _compact(_CSS)
+HEADER_HTML = _compact(_HEADER)
+HERO_HTML = _compact(_HERO)
+INTRO_CARD_HTML = _compact(_INTRO_CARD)
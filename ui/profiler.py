@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# ------------------------------------------------------------
+# Rerun profiler
+#
+# Set COACH_PROFILE=1 to record timing spans for each Streamlit rerun
+# (CSS injection, secrets, sidebar, tracker, transcript, model call...).
+# Traces are kept per session and can be downloaded as Chrome trace JSON
+# (open in chrome://tracing, Perfetto or speedscope). Milestones such as the
+# password screen and the first reply show up as instant marks.
+#
+# When profiling is off, span() hands back one shared no-op object, so the
+# instrumented code pays for a single attribute check.
+# ------------------------------------------------------------
+
+PROFILE_ENV = "COACH_PROFILE"
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class RerunTrace:
+    def __init__(self, label: str):
+        self.label = label
+        self.wall_start = time.time()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        # (name, start_ns, duration_ns, depth)
+        self.events: List[tuple] = []
+        self.marks: List[tuple] = []
+        self.depth = 0
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def rows(self) -> List[dict]:
+        return [
+            {
+                "section": ("  " * depth) + name,
+                "start_ms": round((start - self.start_ns) / 1e6, 2),
+                "duration_ms": round(dur / 1e6, 2),
+            }
+            for name, start, dur, depth in sorted(self.events, key=lambda e: (e[1], e[3]))
+        ]
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        base_us = self.wall_start * 1e6
+        events = [
+            {
+                "name": self.label,
+                "cat": "rerun",
+                "ph": "X",
+                "ts": base_us,
+                "dur": self.duration_ms * 1e3,
+                "pid": pid,
+                "tid": 1,
+            }
+        ]
+        for name, start, dur, _depth in self.events:
+            events.append({
+                "name": name,
+                "cat": "section",
+                "ph": "X",
+                "ts": base_us + (start - self.start_ns) / 1e3,
+                "dur": dur / 1e3,
+                "pid": pid,
+                "tid": 1,
+            })
+        for name, at in self.marks:
+            events.append({
+                "name": name,
+                "cat": "mark",
+                "ph": "i",
+                "s": "p",
+                "ts": base_us + (at - self.start_ns) / 1e3,
+                "pid": pid,
+                "tid": 1,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start", "depth")
+
+    def __init__(self, trace: RerunTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.trace.depth
+        self.trace.depth += 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        # Recorded even when st.rerun()/st.stop() unwinds through the span
+        self.trace.events.append((self.name, self.start, time.perf_counter_ns() - self.start, self.depth))
+        self.trace.depth -= 1
+        return False
+
+
+class _Section:
+    """Span inside the open rerun trace, or a trace of its own for a fragment-only rerun."""
+
+    __slots__ = ("profiler", "name", "own", "span")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.own = self.profiler.current is None
+        if self.own:
+            self.profiler.begin(f"fragment:{self.name}")
+        self.span = _Span(self.profiler.current, self.name).__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.span.__exit__(*exc)
+        if self.own:
+            self.profiler.end()
+        return False
+
+
+class Profiler:
+    def __init__(self, enabled: bool, keep: int = 25):
+        self.enabled = enabled
+        self.traces = deque(maxlen=keep)
+        self.current: Optional[RerunTrace] = None
+
+    def begin(self, label: str = "rerun") -> None:
+        if not self.enabled:
+            return
+        if self.current is not None:
+            # The previous run was cut short by st.rerun(); close it where its last span ended
+            ends = [start + dur for _name, start, dur, _depth in self.current.events]
+            self.current.end_ns = max(ends) if ends else self.current.start_ns
+            self.current = None
+        self.current = RerunTrace(label)
+        self.traces.append(self.current)
+
+    def end(self) -> None:
+        if self.current is not None:
+            self.current.end_ns = time.perf_counter_ns()
+            self.current = None
+
+    def span(self, name: str):
+        if not self.enabled or self.current is None:
+            return _NOOP
+        return _Span(self.current, name)
+
+    def section(self, name: str):
+        if not self.enabled:
+            return _NOOP
+        return _Section(self, name)
+
+    def mark(self, name: str) -> None:
+        if self.enabled and self.current is not None:
+            self.current.marks.append((name, time.perf_counter_ns()))
+
+    def completed(self) -> List[RerunTrace]:
+        return [t for t in self.traces if t.end_ns is not None]
+
+
+def chrome_trace_json(trace: RerunTrace) -> str:
+    return json.dumps(trace.to_chrome_trace())
+
+
+# ------------------------------------------------------------
+# Cold-start metrics
+#
+# Always on: one perf_counter() per milestone. Per worker process, these
+# record how long participants wait for the password screen (from their
+# first rerun) and for Marvin's first reply (from the first rerun past the
+# gate, which imports the SDK and feature modules; the time spent writing
+# the first message is in it too). The first sample is kept apart because
+# it is the cold one: a fresh worker, with those imports still to run.
+# ------------------------------------------------------------
+
+TIME_TO_PASSWORD_SCREEN = "time_to_password_screen"
+TIME_TO_FIRST_REPLY = "time_to_first_reply"
+
+
+class StartupMetrics:
+    def __init__(self, keep: int = 200):
+        self._lock = threading.Lock()
+        self._keep = keep
+        self._first: Dict[str, float] = {}
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._first.setdefault(name, seconds)
+            self._samples.setdefault(name, deque(maxlen=self._keep)).append(seconds)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                out[name] = {
+                    "first_ms": round(self._first[name] * 1000, 1),
+                    "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                    "count": len(ordered),
+                }
+            return out
+
+
+startup_metrics = StartupMetrics()
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+# ------------------------------------------------------------
+# System prompt registry
+#
+# Sessions keep a short version key instead of the prompt text. The text is
+# held once per process, per version, and resolved on each model call.
+# The file is only re-read when its mtime changes, so editing the prompt
+# gives new sessions a new version while running sessions keep theirs.
+# ------------------------------------------------------------
+
+PROMPT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "coaches", "strategy", "system_prompt.txt"
+)
+
+_lock = threading.Lock()
+_prompts: Dict[str, str] = {}
+_loaded: Optional[Tuple[float, str]] = None  # (mtime, version key) of the file on disk
+
+
+def load_system_prompt() -> str:
+    if not os.path.exists(PROMPT_PATH):
+        raise FileNotFoundError(f"system_prompt.txt not found. Expected at: {PROMPT_PATH}")
+    with open(PROMPT_PATH, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def parse_prompt_version(text: str) -> str:
+    """Extract the version string from the header lines of the prompt."""
+    for line in text.splitlines()[:5]:
+        if "VERSION" in line.upper():
+            # Extract e.g. "V10.0" from "VERSION V10.0 — Centre for Business Growth"
+            for part in line.strip().split():
+                if part.upper().startswith("V") and any(c.isdigit() for c in part):
+                    return part.strip("—").strip()
+    return "unknown"
+
+
+def current_prompt_version() -> str:
+    """Version key for the prompt currently on disk, registering it if new."""
+    global _loaded
+    mtime = os.path.getmtime(PROMPT_PATH) if os.path.exists(PROMPT_PATH) else -1.0
+    loaded = _loaded
+    if loaded and loaded[0] == mtime:
+        return loaded[1]
+
+    with _lock:
+        if _loaded and _loaded[0] == mtime:
+            return _loaded[1]
+        text = load_system_prompt()
+        label = parse_prompt_version(text)
+        # The declared version isn't always bumped on edits, so the key includes a content hash
+        key = f"{label}@{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}"
+        _prompts.setdefault(key, text)
+        _loaded = (mtime, key)
+        return key
+
+
+def resolve_prompt(version: str) -> str:
+    try:
+        return _prompts[version]
+    except KeyError:
+        # The process restarted since the session began; fall back to the prompt on disk
+        return _prompts[current_prompt_version()]
+
+
+def prompt_label(version: str) -> str:
+    return (version or "unknown").split("@", 1)[0]
@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+# ------------------------------------------------------------
+# Tail-latency policy for model calls
+#
+# - Hedging: if the primary request hasn't answered by the observed p95
+#   (or a fixed HEDGE_AFTER_SECONDS), a duplicate request is fired, optionally
+#   on the fallback model, and whichever finishes first wins.
+# - Circuit breaker: after repeated primary failures, traffic goes straight
+#   to the fallback model until a cool-down has passed.
+# - Metrics: hedge rate and hedge win rate for the facilitator/debug view.
+#
+# The hedge delay is measured from when the primary request starts running,
+# not from when it was queued, and hedges run in their own small pool with a
+# cap on how many are in flight: under overload, extra duplicates would only
+# queue behind each other. A losing request can't be cancelled mid-flight, so
+# the client is built with no SDK retries and an explicit timeout
+# (REQUEST_TIMEOUT_SECONDS) to bound how long it holds a worker.
+#
+# State is process-wide: every session served by this worker shares it.
+# ------------------------------------------------------------
+
+REQUEST_TIMEOUT_SECONDS = 60.0
+MAX_HEDGES_IN_FLIGHT = 4
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="model-call")
+_hedge_executor = ThreadPoolExecutor(max_workers=MAX_HEDGES_IN_FLIGHT, thread_name_prefix="model-hedge")
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Overload, rate limit, server and network errors are worth hedging / failing over."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        return True
+    return status == 429 or status >= 500
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))
+        return samples[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_after: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                # Half-open: let the next request probe the primary again
+                self._opened_at = None
+                self._failures = self.failure_threshold - 1
+                return False
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HedgeMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0
+        self.failovers = 0
+        self.breaker_routed = 0
+        self.errors = 0
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges_fired": self.hedges_fired,
+                "hedge_wins": self.hedge_wins,
+                "hedge_win_rate": round(self.hedge_wins / self.hedges_fired, 3) if self.hedges_fired else None,
+                "hedges_skipped": self.hedges_skipped,
+                "failovers": self.failovers,
+                "breaker_routed": self.breaker_routed,
+                "errors": self.errors,
+            }
+
+
+class TailLatencyPolicy:
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        default_hedge_after: float = 12.0,
+        min_hedge_after: float = 2.0,
+        min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        max_hedges_in_flight: int = MAX_HEDGES_IN_FLIGHT,
+    ):
+        self.percentile = percentile
+        self.default_hedge_after = default_hedge_after
+        self.min_hedge_after = min_hedge_after
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = HedgeMetrics()
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges_in_flight)
+
+    def hedge_after(self, fixed: Optional[float] = None) -> float:
+        if fixed is not None:
+            return fixed
+        if len(self.latency) < self.min_samples:
+            return self.default_hedge_after
+        return max(self.min_hedge_after, self.latency.percentile(self.percentile))
+
+    def call(
+        self,
+        send: Callable[[str], object],
+        primary: str,
+        fallback: Optional[str] = None,
+        hedge_to_fallback: bool = False,
+        hedge_after: Optional[float] = None,
+    ):
+        """Run send(model) under the hedging / circuit-breaker policy and return its result."""
+        self.metrics.bump("calls")
+
+        if fallback and self.breaker.is_open:
+            self.metrics.bump("breaker_routed")
+            return send(fallback)
+
+        running = threading.Event()
+        started = [0.0]
+
+        def run_primary():
+            started[0] = time.monotonic()
+            running.set()
+            return send(primary)
+
+        primary_future = _executor.submit(run_primary)
+
+        def _record_latency(fut):
+            # Recorded even when a hedge won, so slow primaries still shape the p95
+            if fut.exception() is None:
+                self.latency.record(time.monotonic() - started[0])
+
+        primary_future.add_done_callback(_record_latency)
+        # Time spent queued for a worker doesn't count towards the hedge delay
+        running.wait()
+        delay = self.hedge_after(hedge_after) - (time.monotonic() - started[0])
+        done, _ = wait([primary_future], timeout=max(0.0, delay))
+
+        if done:
+            # Answered (or failed fast, in which case fail over straight away) before the hedge delay
+            return self._finish_unhedged(primary_future, send, fallback)
+
+        # Primary is slower than the threshold: race a duplicate against it, if there's room
+        if not self._hedge_slots.acquire(blocking=False):
+            self.metrics.bump("hedges_skipped")
+            return self._finish_unhedged(primary_future, send, fallback)
+        self.metrics.bump("hedges_fired")
+        hedge_model = fallback if (hedge_to_fallback and fallback) else primary
+        hedge_future = _hedge_executor.submit(send, hedge_model)
+        hedge_future.add_done_callback(lambda _fut: self._hedge_slots.release())
+        pending = {primary_future, hedge_future}
+        last_exc: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                exc = fut.exception()
+                if fut is primary_future:
+                    if exc is None:
+                        self.breaker.record_success()
+                    elif is_retryable(exc):
+                        self.breaker.record_failure()
+                if exc is not None:
+                    last_exc = exc
+                    continue
+                if fut is hedge_future:
+                    self.metrics.bump("hedge_wins")
+                # The losing request is left to finish in the background (bounded by the client timeout)
+                return fut.result()
+
+        if fallback and hedge_model != fallback and is_retryable(last_exc):
+            # Both primary attempts failed: the fallback hasn't been tried yet
+            self.metrics.bump("failovers")
+            return send(fallback)
+        self.metrics.bump("errors")
+        raise last_exc
+
+    def _finish_unhedged(self, primary_future, send: Callable[[str], object], fallback: Optional[str]):
+        """Wait for the primary alone; on a retryable failure, fail over to the fallback."""
+        exc = primary_future.exception()
+        if exc is None:
+            self.breaker.record_success()
+            return primary_future.result()
+        if is_retryable(exc):
+            self.breaker.record_failure()
+            if fallback:
+                self.metrics.bump("failovers")
+                return send(fallback)
+        self.metrics.bump("errors")
+        raise exc
+
+
+_policy: Optional[TailLatencyPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_policy() -> TailLatencyPolicy:
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = TailLatencyPolicy()
+        return _policy
@@ -0,0 +1,85 @@
+from typing import List, Optional, Sequence
+
+# ------------------------------------------------------------
+# Scoped revision turns
+#
+# "Revise scope: ..." late in a session only changes one field, so it
+# doesn't need the whole transcript. The request is built from the current
+# normalised strategy_state, the component being revised and the last
+# exchange, and the reply's state is merged back field by field: only the
+# revised component and what depends on it (the statement drafts) can
+# change, and the phase never moves backwards.
+# ------------------------------------------------------------
+
+EXCHANGE_CHARS = 600
+
+# Fields a revision may legitimately change besides the targeted component
+_DEPENDENT_FIELDS = ("strategic_assumptions", "next_question", "draft_statement", "refined_statement")
+
+
+def revision_instructions(component: str) -> str:
+    return (
+        f"\n\nThis is a scoped revision turn: the owner is revising only the {component.title()}. "
+        "The rest of the working strategy below stands and is not up for discussion in this reply. "
+        f"Reflect the revised {component.title()} back in your own words, sharpen it if it needs it, "
+        "and ask at most one question. If a draft statement exists, update it to match. "
+        "Append the STATE_JSON block as usual, with every field filled from the working strategy."
+    )
+
+
+def _clip(text: str, n: int = EXCHANGE_CHARS) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= n else text[: n - 1].rstrip() + "…"
+
+
+def last_exchange(chat: List[dict]) -> List[dict]:
+    """The most recent assistant message and the user message before it, if any."""
+    for i in range(len(chat) - 1, -1, -1):
+        if chat[i].get("role") == "assistant":
+            exchange = [chat[i]]
+            if i > 0 and chat[i - 1].get("role") == "user":
+                exchange.insert(0, chat[i - 1])
+            return exchange
+    return []
+
+
+def build_revision_request(state: dict, component: str, revision: str, exchange: List[dict]) -> str:
+    assumptions = "; ".join(state.get("strategic_assumptions") or []) or "—"
+    lines = [
+        "Working strategy:",
+        f"Business: {state.get('business_type') or '—'} / {state.get('industry') or '—'} / "
+        f"team {state.get('team_size') or '—'}",
+        f"Phase: {state.get('current_phase') or '—'}",
+        f"Objective: {state.get('objective') or '—'}",
+        f"Scope: {state.get('scope') or '—'}",
+        f"Advantage: {state.get('advantage') or '—'}",
+        f"Assumptions: {assumptions}",
+        f"Draft statement: {state.get('draft_statement') or '—'}",
+        f"Refined statement: {state.get('refined_statement') or '—'}",
+    ]
+    if exchange:
+        lines.append("\nLast exchange:")
+        lines += [
+            f"{'Marvin' if m['role'] == 'assistant' else 'Owner'}: {_clip(m['content'])}" for m in exchange
+        ]
+    lines.append(f"\nRevised {component.title()} from the owner: {revision}")
+    return "\n".join(lines)
+
+
+def merge_revision(current: dict, returned: Optional[dict], component: str, phases: Sequence[str]) -> dict:
+    """Current state with the revised component (and dependent fields) taken from the reply."""
+    merged = dict(current)
+    if not isinstance(returned, dict):
+        return merged
+    value = returned.get(component)
+    if isinstance(value, str) and value.strip():
+        merged[component] = value
+    for key in _DEPENDENT_FIELDS:
+        if returned.get(key):
+            merged[key] = returned[key]
+    # A revision reply re-opens the statement, so any pending commitment question lapses
+    merged["awaiting_commitment"] = returned.get("awaiting_commitment", False)
+    order = {p: i for i, p in enumerate(phases)}
+    if order.get(returned.get("current_phase"), -1) > order.get(current.get("current_phase"), -1):
+        merged["current_phase"] = returned["current_phase"]
+    return merged
@@ -0,0 +1,250 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+from local_sqlite import SharedInstances, SQLiteFile, data_path
+
+# ------------------------------------------------------------
+# Shared session store
+#
+# st.session_state lives in the Streamlit process that owns the websocket,
+# so a restarted worker (or a reconnect landing on another one) loses the
+# session. The durable parts of a session are mirrored here, keyed by the
+# ?sid= query parameter, so any worker can pick it up:
+#
+#   chat, strategy_state, final_strategy, is_locked, assistant_asked_commitment
+#
+# The undo history and named drafts (StateHistory) are not stored: up to
+# 40 states per draft would make every save many times larger. A session
+# picked up by another worker keeps its current state but starts a fresh
+# history, so undo and draft switching reach back only to that point.
+#
+# Writes are small: chat is stored as one row per message and only new
+# messages are sent; the other fields are one JSON row. Every save names
+# the version it was based on, and a save against a stale version raises
+# SessionConflict instead of overwriting another worker's turn.
+#
+# Backends, chosen by the SESSION_STORE setting:
+#   memory (default)         - this process only; same behaviour as before
+#   sqlite[:///path]         - shared by every worker on one host
+#   redis://host:port/db     - shared across hosts (needs the redis package)
+#
+# Sessions untouched for SESSION_TTL_SECONDS expire in every backend; the
+# memory store also keeps at most MAX_MEMORY_SESSIONS, least recently used
+# first out.
+# ------------------------------------------------------------
+
+STORED_FIELDS = ("strategy_state", "final_strategy", "is_locked", "assistant_asked_commitment")
+
+DEFAULT_SQLITE_PATH = data_path("sessions.sqlite3")
+SESSION_TTL_SECONDS = 14 * 24 * 3600
+MAX_MEMORY_SESSIONS = 1000
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class SessionConflict(Exception):
+    """The session was saved by another worker since it was loaded here."""
+
+
+class StoredSession(NamedTuple):
+    version: int
+    chat: List[dict]
+    fields: Dict
+
+
+class InMemorySessionStore:
+    def __init__(self, ttl: float = SESSION_TTL_SECONDS, max_sessions: int = MAX_MEMORY_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        # sid -> (session, last saved), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, sid: str, now: float) -> Optional[StoredSession]:
+        entry = self._sessions.get(sid)
+        if entry is None:
+            return None
+        stored, saved_at = entry
+        if now - saved_at > self.ttl:
+            del self._sessions[sid]
+            return None
+        self._sessions.move_to_end(sid)
+        return stored
+
+    def load(self, sid: str) -> Optional[StoredSession]:
+        with self._lock:
+            stored = self._get(sid, time.time())
+            if stored is None:
+                return None
+            return StoredSession(stored.version, list(stored.chat), dict(stored.fields))
+
+    def save(self, sid: str, version: int, chat_from: int, messages: List[dict], fields: Dict) -> int:
+        """Truncate chat to `chat_from`, append `messages`, replace fields. Returns the new version."""
+        with self._lock:
+            now = time.time()
+            stored = self._get(sid, now)
+            current = stored.version if stored else 0
+            if current != version:
+                raise SessionConflict(sid)
+            chat = list(stored.chat[:chat_from]) if stored else []
+            self._sessions[sid] = (StoredSession(current + 1, chat + list(messages), dict(fields)), now)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return current + 1
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SQLiteSessionStore(SQLiteFile):
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, ttl: float = SESSION_TTL_SECONDS):
+        super().__init__(path)
+        self.ttl = ttl
+        self._purged_at = 0.0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sessions (
+                    sid TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    fields TEXT NOT NULL,
+                    updated REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS messages (
+                    sid TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    message TEXT NOT NULL,
+                    PRIMARY KEY (sid, idx)
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+
+    def load(self, sid: str) -> Optional[StoredSession]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT version, fields FROM sessions WHERE sid = ? AND updated >= ?", (sid, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute("SELECT message FROM messages WHERE sid = ? ORDER BY idx", (sid,)).fetchall()
+        return StoredSession(row[0], [json.loads(m) for (m,) in rows], json.loads(row[1]))
+
+    def save(self, sid: str, version: int, chat_from: int, messages: List[dict], fields: Dict) -> int:
+        now = time.time()
+        if now - self._purged_at > PURGE_INTERVAL_SECONDS:
+            self.purge_expired(now)
+        with self._connect() as conn:
+            if version == 0:
+                # An expired session that hasn't been purged yet doesn't block a fresh one
+                conn.execute("DELETE FROM sessions WHERE sid = ? AND updated < ?", (sid, now - self.ttl))
+                try:
+                    conn.execute(
+                        "INSERT INTO sessions (sid, version, fields, updated) VALUES (?, 1, ?, ?)",
+                        (sid, json.dumps(fields), now),
+                    )
+                except sqlite3.IntegrityError:
+                    raise SessionConflict(sid)
+            else:
+                cur = conn.execute(
+                    "UPDATE sessions SET version = version + 1, fields = ?, updated = ? WHERE sid = ? AND version = ?",
+                    (json.dumps(fields), now, sid, version),
+                )
+                if cur.rowcount != 1:
+                    raise SessionConflict(sid)
+            # Same transaction as the version bump, so a conflict leaves chat untouched
+            conn.execute("DELETE FROM messages WHERE sid = ? AND idx >= ?", (sid, chat_from))
+            conn.executemany(
+                "INSERT INTO messages (sid, idx, message) VALUES (?, ?, ?)",
+                [(sid, chat_from + i, json.dumps(m)) for i, m in enumerate(messages)],
+            )
+        return version + 1
+
+    def delete(self, sid: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE sid = ?", (sid,))
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete sessions (and their messages) not saved within the TTL. Returns how many went."""
+        now = time.time() if now is None else now
+        self._purged_at = now
+        cutoff = now - self.ttl
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM messages WHERE sid IN (SELECT sid FROM sessions WHERE updated < ?)", (cutoff,)
+            )
+            return conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,)).rowcount
+
+
+class RedisSessionStore:
+    """Any Redis-protocol server (Redis, Valkey, KeyDB). Chat is a list, fields a hash."""
+
+    def __init__(self, url: str):
+        import redis  # optional dependency, only needed for this backend
+
+        self._redis = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+
+    @staticmethod
+    def _keys(sid: str):
+        return f"coach:session:{sid}", f"coach:session:{sid}:chat"
+
+    def load(self, sid: str) -> Optional[StoredSession]:
+        meta_key, chat_key = self._keys(sid)
+        pipe = self._redis.pipeline()
+        pipe.hmget(meta_key, "version", "fields")
+        pipe.lrange(chat_key, 0, -1)
+        (version, fields), chat = pipe.execute()
+        if version is None:
+            return None
+        return StoredSession(int(version), [json.loads(m) for m in chat], json.loads(fields))
+
+    def save(self, sid: str, version: int, chat_from: int, messages: List[dict], fields: Dict) -> int:
+        meta_key, chat_key = self._keys(sid)
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(meta_key)
+                current = pipe.hget(meta_key, "version")
+                if int(current or 0) != version:
+                    raise SessionConflict(sid)
+                pipe.multi()
+                pipe.hset(meta_key, mapping={"version": version + 1, "fields": json.dumps(fields)})
+                if chat_from > 0:
+                    pipe.ltrim(chat_key, 0, chat_from - 1)
+                else:
+                    pipe.delete(chat_key)
+                if messages:
+                    pipe.rpush(chat_key, *[json.dumps(m) for m in messages])
+                pipe.expire(meta_key, SESSION_TTL_SECONDS)
+                pipe.expire(chat_key, SESSION_TTL_SECONDS)
+                pipe.execute()
+            except self._watch_error:
+                raise SessionConflict(sid)
+        return version + 1
+
+    def delete(self, sid: str) -> None:
+        self._redis.delete(*self._keys(sid))
+
+
+def _open_store(spec: str):
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(spec)
+    if spec.startswith("sqlite"):
+        path = spec[len("sqlite:///"):] if spec.startswith("sqlite:///") else DEFAULT_SQLITE_PATH
+        return SQLiteSessionStore(path or DEFAULT_SQLITE_PATH)
+    return InMemorySessionStore()
+
+
+_stores: SharedInstances = SharedInstances(_open_store)
+
+
+def get_store(spec: Optional[str] = None):
+    """Process-wide store for a SESSION_STORE spec: memory, sqlite[:///path] or redis://..."""
+    return _stores.get((spec or "memory").strip())
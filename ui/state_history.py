@@ -0,0 +1,159 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# ------------------------------------------------------------
+# Strategy state history (undo + named branches)
+#
+# Every recorded turn becomes a snapshot node. A node stores only the fields
+# that changed against its parent; unchanged values are the parent's objects,
+# shared by reference, so a snapshot costs one small dict regardless of how
+# long the statement text is. Each node also keeps its resolved view, which
+# makes reading, undoing and switching branches O(1).
+#
+# Memory is bounded: each branch keeps a window of its last `max_depth`
+# snapshots, and there are at most `max_branches` branches. A record() or
+# undo() only moves the current branch's window; a node is dropped once no
+# window holds it, and its children become roots (their views are already
+# resolved). Forking copies one window, so it costs O(max_depth).
+# ------------------------------------------------------------
+
+MAIN_BRANCH = "main"
+MAX_BRANCHES = 8
+
+
+def _freeze(value):
+    # Lists become tuples so snapshots can safely share them
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class _Node:
+    __slots__ = ("id", "parent", "children", "changes", "view", "label", "refs")
+
+    def __init__(self, node_id: int, parent: Optional["_Node"], changes: dict, label: str):
+        self.id = node_id
+        self.parent = parent
+        self.children = set()
+        self.changes = changes
+        self.label = label
+        # Number of branch windows holding this node
+        self.refs = 0
+        if parent is None:
+            self.view = dict(changes)
+        else:
+            self.view = {**parent.view, **changes}
+            parent.children.add(self)
+
+
+class StateHistory:
+    def __init__(self, initial_state: dict, max_depth: int = 40, max_branches: int = MAX_BRANCHES):
+        self.max_depth = max(2, int(max_depth))
+        self.max_branches = max(1, int(max_branches))
+        self._next_id = 0
+        self._nodes: Dict[int, _Node] = {}
+        root = self._new_node(None, {k: _freeze(v) for k, v in initial_state.items()}, "start")
+        # Branch name -> its last `max_depth` snapshots, oldest first; the head is the last
+        self._windows: Dict[str, Deque[_Node]] = {MAIN_BRANCH: deque()}
+        self._push(self._windows[MAIN_BRANCH], root)
+        self.branch_name = MAIN_BRANCH
+
+    def _new_node(self, parent: Optional[_Node], changes: dict, label: str) -> _Node:
+        node = _Node(self._next_id, parent, changes, label)
+        self._nodes[node.id] = node
+        self._next_id += 1
+        return node
+
+    @staticmethod
+    def _push(window: Deque[_Node], node: _Node) -> None:
+        window.append(node)
+        node.refs += 1
+
+    def _release(self, node: _Node) -> None:
+        node.refs -= 1
+        if node.refs:
+            return
+        del self._nodes[node.id]
+        if node.parent is not None:
+            node.parent.children.discard(node)
+        for child in node.children:
+            # Oldest kept snapshot becomes a root; its view is already resolved
+            child.parent = None
+            child.changes = dict(child.view)
+        node.children.clear()
+
+    @property
+    def _window(self) -> Deque[_Node]:
+        return self._windows[self.branch_name]
+
+    @property
+    def head(self) -> _Node:
+        return self._window[-1]
+
+    def current(self) -> dict:
+        return {k: _thaw(v) for k, v in self.head.view.items()}
+
+    def record(self, state: dict, label: str = "") -> bool:
+        """Snapshot `state` on the current branch. Returns False if nothing changed."""
+        head = self.head
+        changes = {}
+        for k, v in state.items():
+            frozen = _freeze(v)
+            if k not in head.view or head.view[k] != frozen:
+                changes[k] = frozen
+        if not changes:
+            return False
+        window = self._window
+        self._push(window, self._new_node(head, changes, label))
+        if len(window) > self.max_depth:
+            self._release(window.popleft())
+        return True
+
+    def can_undo(self) -> bool:
+        return len(self._window) > 1
+
+    def undo(self) -> Optional[dict]:
+        """Step the current branch back one snapshot. The undone node is kept
+        only while another branch still references it."""
+        window = self._window
+        if len(window) < 2:
+            return None
+        self._release(window.pop())
+        return self.current()
+
+    def branch(self, name: str) -> None:
+        """Fork a named branch at the current snapshot and switch to it."""
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Branch name is required.")
+        if name in self._windows:
+            raise ValueError(f"A draft called '{name}' already exists.")
+        if len(self._windows) >= self.max_branches:
+            raise ValueError(f"You can keep up to {self.max_branches} drafts.")
+        window: Deque[_Node] = deque()
+        for node in self._window:
+            self._push(window, node)
+        self._windows[name] = window
+        self.branch_name = name
+
+    def checkout(self, name: str) -> dict:
+        if name not in self._windows:
+            raise KeyError(name)
+        self.branch_name = name
+        return self.current()
+
+    def branches(self) -> List[str]:
+        return list(self._windows)
+
+    def changed_fields(self) -> List[str]:
+        """Fields touched by the snapshot at the current head."""
+        return list(self.head.changes) if self.head.parent is not None else []
+
+    def __len__(self) -> int:
+        return len(self._nodes)
@@ -0,0 +1,233 @@
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+# ------------------------------------------------------------
+# Local strategy-statement linter
+#
+# Deterministic, regex-only checks that catch the common gaps before a
+# model round trip does: an objective with no number or no timeframe, a
+# scope described only by demographics, and an "advantage" that is really
+# efficiency (better / faster / cheaper) rather than difference.
+#
+# Runs in well under a millisecond per text, so it can run on every message
+# and can batch-score large sets of statements for evaluation. A reply is
+# only linted when it looks like component text: "yes", "what do you
+# mean?" or "that captures it" are answers, not objectives.
+# ------------------------------------------------------------
+
+WARN = "warn"
+INFO = "info"
+
+
+class Finding(NamedTuple):
+    code: str
+    severity: str
+    component: str
+    message: str
+
+
+_NUM_WORDS = r"one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|eighteen|twenty|thirty|fifty|hundred"
+
+_TIMEFRAME_RE = re.compile(
+    rf"""\b(?:
+        (?:by|before|within|in|over|inside|across)\s+(?:the\s+)?(?:next\s+|coming\s+)?
+            (?:\d+(?:\.\d+)?|{_NUM_WORDS}|a|an)\s*(?:-\s*)?(?:months?|years?|yrs?|quarters?|weeks?)
+      | next\s+(?:\d+|{_NUM_WORDS})?\s*(?:months?|years?|quarters?|financial\s+year)
+      | (?:by|before|in|during|until)\s+(?:end\s+of\s+|the\s+end\s+of\s+)?(?:(?:fy|cy)\s*'?\d{{2,4}}|(?:19|20)\d{{2}})
+      | (?:by|before)\s+(?:the\s+)?end\s+of\s+(?:the\s+)?(?:next\s+)?(?:year|financial\s+year|quarter)
+      | (?:fy|cy)\s*'?\d{{2,4}}
+      | \d+\s*-?\s*(?:month|year)\s+(?:plan|target|horizon|goal)
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_TARGET_RE = re.compile(
+    rf"""(?:
+        [$£€]\s*\d
+      | \d[\d,.]*\s*(?:%|percent|per\s+cent|k\b|m\b|mil|million|billion|bn\b)
+      | \b\d[\d,.]*\b
+      | \b(?:double|triple|quadruple|halve|{_NUM_WORDS})\b
+    )""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_DEMOGRAPHIC_RE = re.compile(
+    r"""\b(?:
+        aged?|ages|years?\s+old|\d+\s*(?:-|to)\s*\d+\s*(?:year|yo)|men|women|male|female|
+        families|parents|retirees|seniors|students|millennials|gen\s*[xyz]|boomers|
+        suburbs?|suburban|metro|regional|rural|local|locals|residents|homeowners|
+        postcodes?|city|cities|state|nationwide|australia\w*|adelaide|sydney|melbourne|
+        brisbane|perth|income|earners?|smes?|small\s+business(?:es)?|businesses\s+with\s+\d+
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_PSYCHOGRAPHIC_RE = re.compile(
+    r"""\b(?:
+        who\s+(?:want|wants|value|values|need|needs|care|cares|prefer|prefers|are\s+looking|
+            struggle|struggles|delegate|delegates|hate|hates|expect|expects|trust|trusts)|
+        that\s+(?:want|value|need|care|prefer|struggle|delegate)|
+        looking\s+for|willing\s+to|frustrated|time-poor|time\s+poor|risk-averse|conservative|
+        prioriti[sz]e|motivated|worried|anxious|ambitious|values?|needs?|pain|jobs?\s+to\s+be\s+done
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_EFFICIENCY_RE = re.compile(
+    r"""\b(?:
+        better\s+(?:service|quality|customer\s+service|value|prices?)|
+        (?:great|good|excellent|high|higher|superior|outstanding)\s+(?:customer\s+)?(?:service|quality)|
+        faster|quicker|quick\s+turnaround|on\s+time|more\s+reliable|reliab(?:le|ility)|
+        cheaper|lower\s+(?:cost|costs|prices?)|low\s+(?:cost|prices?)|competitive\s+pric\w*|
+        (?:more\s+)?efficien(?:t|cy)|best\s+practice|professional(?:ism)?|experienced|
+        years\s+of\s+experience|friendly|responsive|attention\s+to\s+detail|passion(?:ate)?
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_DIFFERENCE_RE = re.compile(
+    r"""\b(?:
+        only|unique(?:ly)?|exclusive(?:ly)?|proprietary|patent\w*|nobody\s+else|no\s+one\s+else|
+        (?:hard|difficult)\s+to\s+copy|can'?t\s+(?:easily\s+)?(?:copy|match)|network|licen[cs]e\w*|
+        specialis\w*|speciali[sz]\w*|dedicated|trade[-\s]?offs?|instead\s+of|rather\s+than|unlike
+    )\b""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+_ACK_RE = re.compile(
+    r"^\s*(?:yes|yeah|yep|ok|okay|sure|no|nope|not\s+sure|maybe|sounds|perfect|great|"
+    r"that'?s|that\s+(?:captures|works|is|sounds)|this\s+(?:captures|works|is)|i\s+(?:think|agree|guess))\b",
+    re.IGNORECASE,
+)
+_OBJECTIVE_SIGNAL_RE = re.compile(
+    r"[$£€%]|\b(?:grow\w*|increase\w*|reach\w*|revenue|turnover|sales|profit\w*|margins?|customers?|"
+    r"clients?|market\s+share|double|triple|achieve|become|expand\w*|win|hit)\b",
+    re.IGNORECASE,
+)
+_MIN_WORDS = {"objective": 4, "scope": 5, "advantage": 4, "strategy_statement": 12}
+_ACK_MAX_WORDS = 12
+
+
+def looks_like_component(text: str, phase: str) -> bool:
+    """Whether a reply reads as a proposed objective/scope/advantage/statement, not an answer or question."""
+    text = (text or "").strip()
+    words = len(text.split())
+    if words < _MIN_WORDS.get(phase, 4) or text.endswith("?"):
+        return False
+    if words < _ACK_MAX_WORDS and _ACK_RE.match(text):
+        return False
+    if phase == "objective" and not _OBJECTIVE_SIGNAL_RE.search(text):
+        return False
+    return True
+
+
+def has_timeframe(text: str) -> bool:
+    return bool(_TIMEFRAME_RE.search(text or ""))
+
+
+def has_target(text: str) -> bool:
+    # Numbers that only belong to the timeframe ("next 12 months", "by 2027") don't count
+    return bool(_TARGET_RE.search(_TIMEFRAME_RE.sub(" ", text or "")))
+
+
+def lint_objective(text: str) -> List[Finding]:
+    if not (text or "").strip():
+        return []
+    findings = []
+    if not has_target(text):
+        findings.append(Finding("NO_TARGET", WARN, "objective", "Objective has no number to measure against."))
+    if not has_timeframe(text):
+        findings.append(Finding("NO_TIMEFRAME", WARN, "objective", "Objective has no timeframe."))
+    return findings
+
+
+def lint_scope(text: str) -> List[Finding]:
+    if not (text or "").strip():
+        return []
+    if _DEMOGRAPHIC_RE.search(text) and not _PSYCHOGRAPHIC_RE.search(text):
+        return [Finding(
+            "DEMOGRAPHIC_SCOPE", WARN, "scope",
+            "Scope describes who customers are, not what they want or value.",
+        )]
+    return []
+
+
+def lint_advantage(text: str) -> List[Finding]:
+    if not (text or "").strip():
+        return []
+    m = _EFFICIENCY_RE.search(text)
+    if m and not _DIFFERENCE_RE.search(text):
+        return [Finding(
+            "EFFICIENCY_ADVANTAGE", WARN, "advantage",
+            f"\"{m.group(0)}\" sounds like doing the same thing better (efficiency), not doing something different.",
+        )]
+    return []
+
+
+_STATEMENT_MESSAGES = {
+    "NO_TARGET": "Statement has no number to measure the objective against.",
+    "NO_TIMEFRAME": "Statement doesn't say by when.",
+}
+
+
+def lint_statement(text: str) -> List[Finding]:
+    if not (text or "").strip():
+        return []
+    findings = lint_objective(text) + lint_advantage(text)
+    return [f._replace(component="statement", message=_STATEMENT_MESSAGES.get(f.code, f.message)) for f in findings]
+
+
+_PHASE_CHECKS = {
+    "objective": lint_objective,
+    "scope": lint_scope,
+    "advantage": lint_advantage,
+    "strategy_statement": lint_statement,
+}
+
+
+def lint_message(text: str, phase: str) -> List[Finding]:
+    """Checks relevant to a user reply given the phase it was sent in."""
+    check = _PHASE_CHECKS.get(phase)
+    if check is None or not looks_like_component(text, phase):
+        return []
+    return check(text)
+
+
+def lint_state(state: dict) -> List[Finding]:
+    findings = lint_objective(state.get("objective", ""))
+    findings += lint_scope(state.get("scope", ""))
+    findings += lint_advantage(state.get("advantage", ""))
+    statement = state.get("refined_statement") or state.get("draft_statement")
+    if statement:
+        findings += lint_statement(statement)
+    return findings
+
+
+def score_statement(text: str) -> float:
+    """1.0 = passes every statement check; each warning costs an equal share."""
+    if not (text or "").strip():
+        return 0.0
+    checks = 3  # target, timeframe, difference-not-efficiency
+    warnings = sum(1 for f in lint_statement(text) if f.severity == WARN)
+    return round(1.0 - warnings / checks, 3)
+
+
+def batch_score(statements: Iterable[str], with_findings: bool = False) -> List[dict]:
+    results = []
+    for text in statements:
+        row = {"statement": text, "score": score_statement(text)}
+        if with_findings:
+            row["findings"] = [f.code for f in lint_statement(text)]
+        results.append(row)
+    return results
+
+
+def format_hints(findings: List[Finding]) -> Optional[str]:
+    if not findings:
+        return None
+    lines = "\n".join(f"- {f.message}" for f in findings)
+    return (
+        "\n\nLocal pre-check of the user's latest reply (use it to guide your next question; "
+        f"never mention it):\n{lines}\n"
+    )
@@ -0,0 +1,299 @@
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from local_sqlite import SharedInstances, SQLiteFile, data_path
+
+# ------------------------------------------------------------
+# Exportable strategy card (PDF + PNG)
+#
+# Cards render on a background worker so the rerun that locks a session
+# isn't blocked. Results are cached by a hash of the card content: the same
+# statement is rendered once, however many times it is downloaded or
+# bulk-exported. Locked cards are also registered per cohort in a local
+# SQLite file next to the token ledger, so a facilitator's zip export covers
+# every worker on the host and survives restarts.
+#
+# The export is not streamed: st.download_button sends one payload, so the
+# zip is built in memory when the facilitator asks for it and dropped once
+# it has been downloaded. Cards that fail to render are left out and named.
+# ------------------------------------------------------------
+
+CACHE_SIZE = 256
+PDF_WIDTH = 595  # A4 width in points
+PNG_WIDTH = 1200
+
+BRAND_RGB = (0, 51, 102)
+INK_RGB = (11, 18, 32)
+MUTED_RGB = (91, 107, 122)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="strategy-card")
+_lock = threading.Lock()
+_cache: "OrderedDict[str, Future]" = OrderedDict()
+
+DEFAULT_REGISTRY_PATH = data_path("strategy_cards.sqlite3")
+
+
+def card_fields(final_strategy: dict, state: dict) -> dict:
+    final_strategy = final_strategy or {}
+    return {
+        "statement": final_strategy.get("refined") or final_strategy.get("draft") or "",
+        "draft": final_strategy.get("draft") or "",
+        "assumptions": list(final_strategy.get("assumptions") or [])[:5],
+        "business_type": (state.get("business_type") or "").upper(),
+        "industry": state.get("industry") or "",
+        "team_size": state.get("team_size") or "",
+    }
+
+
+def card_hash(fields: dict) -> str:
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _context_line(fields: dict) -> str:
+    bits = [fields["business_type"], fields["industry"]]
+    if fields["team_size"]:
+        bits.append(f"Team: {fields['team_size']}")
+    return "  ·  ".join(b for b in bits if b)
+
+
+def _wrap(text: str, max_chars: int) -> List[str]:
+    lines, line = [], ""
+    for word in (text or "").split():
+        if line and len(line) + 1 + len(word) > max_chars:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _card_blocks(fields: dict, chars: int) -> List[Tuple[str, str]]:
+    """Layout-neutral list of (style, text) lines shared by the PDF and PNG renderers."""
+    blocks = [("label", "STRATEGY STATEMENT")]
+    blocks += [("statement", line) for line in _wrap(fields["statement"], chars)]
+    if fields["draft"] and fields["draft"] != fields["statement"]:
+        blocks.append(("gap", ""))
+        blocks.append(("label", "FULL DRAFT"))
+        blocks += [("body", line) for line in _wrap(fields["draft"], int(chars * 1.25))]
+    if fields["assumptions"]:
+        blocks.append(("gap", ""))
+        blocks.append(("label", "WHAT NEEDS TO BE TRUE"))
+        for a in fields["assumptions"]:
+            wrapped = _wrap(a, int(chars * 1.25) - 2)
+            blocks += [("body", ("• " if i == 0 else "  ") + line) for i, line in enumerate(wrapped)]
+    return blocks
+
+
+# -----------------------------
+# PDF (hand-written, Helvetica, no extra dependency)
+# -----------------------------
+_PDF_STYLE = {
+    "label": ("F2", 8, MUTED_RGB, 16),
+    "statement": ("F2", 14, INK_RGB, 19),
+    "body": ("F1", 10, INK_RGB, 14),
+    "gap": ("F1", 10, INK_RGB, 10),
+}
+
+
+def _pdf_text(text: str) -> str:
+    raw = text.encode("cp1252", errors="replace").decode("latin-1")
+    return re.sub(r"([\\()])", r"\\\1", raw)
+
+
+def _rgb(rgb: Tuple[int, int, int]) -> str:
+    return " ".join(f"{c / 255:.3f}" for c in rgb)
+
+
+def render_pdf(fields: dict) -> bytes:
+    blocks = _card_blocks(fields, 62)
+    header_h, margin = 64, 40
+    body_h = sum(_PDF_STYLE[style][3] for style, _ in blocks)
+    height = header_h + margin + body_h + margin
+
+    ops = [
+        f"{_rgb(BRAND_RGB)} rg 0 {height - header_h} {PDF_WIDTH} {header_h} re f",
+        f"BT /F2 15 Tf 1 1 1 rg {margin} {height - 32} Td ({_pdf_text('Marvin — Strategy Coach')}) Tj ET",
+        f"BT /F1 9 Tf 1 1 1 rg {margin} {height - 48} Td ({_pdf_text(_context_line(fields) or 'Centre for Business Growth')}) Tj ET",
+    ]
+    y = height - header_h - margin + 8
+    for style, text in blocks:
+        font, size, rgb, leading = _PDF_STYLE[style]
+        y -= leading
+        if text:
+            ops.append(f"BT /{font} {size} Tf {_rgb(rgb)} rg {margin} {y} Td ({_pdf_text(text)}) Tj ET")
+    content = "\n".join(ops).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PDF_WIDTH} {height}] "
+            "/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>"
+        ).encode("latin-1"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n".encode() + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+# -----------------------------
+# PNG (Pillow, which Streamlit already depends on)
+# -----------------------------
+def _font(size: int, bold: bool = False):
+    from PIL import ImageFont
+
+    for name in (("DejaVuSans-Bold.ttf", "Arial Bold.ttf") if bold else ("DejaVuSans.ttf", "Arial.ttf")):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def render_png(fields: dict) -> bytes:
+    from PIL import Image, ImageDraw
+
+    styles = {
+        "label": (_font(18, bold=True), MUTED_RGB, 36),
+        "statement": (_font(32, bold=True), INK_RGB, 44),
+        "body": (_font(22), INK_RGB, 32),
+        "gap": (None, INK_RGB, 22),
+    }
+    blocks = _card_blocks(fields, 52)
+    header_h, margin = 140, 80
+    height = header_h + margin + sum(styles[s][2] for s, _ in blocks) + margin
+
+    img = Image.new("RGB", (PNG_WIDTH, height), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, PNG_WIDTH, header_h], fill=BRAND_RGB)
+    draw.text((margin, 36), "Marvin — Strategy Coach", font=_font(34, bold=True), fill="white")
+    draw.text((margin, 86), _context_line(fields) or "Centre for Business Growth", font=_font(20), fill="white")
+
+    y = header_h + margin - 20
+    for style, text in blocks:
+        font, rgb, leading = styles[style]
+        if text:
+            draw.text((margin, y), text, font=font, fill=rgb)
+        y += leading
+
+    out = io.BytesIO()
+    img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _render(fields: dict) -> Dict[str, bytes]:
+    return {"pdf": render_pdf(fields), "png": render_png(fields)}
+
+
+def request_card(fields: dict) -> Tuple[str, Future]:
+    """Start rendering (or return the cached job) for this card content."""
+    key = card_hash(fields)
+    with _lock:
+        fut = _cache.get(key)
+        if fut is not None and not (fut.done() and fut.exception() is not None):
+            _cache.move_to_end(key)
+            return key, fut
+        fut = _executor.submit(_render, fields)
+        _cache[key] = fut
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        return key, fut
+
+
+class CardRegistry(SQLiteFile):
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH):
+        super().__init__(path)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS cards (
+                    cohort TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    locked_at REAL NOT NULL,
+                    PRIMARY KEY (cohort, session_id)
+                )"""
+            )
+
+    def register(self, cohort: str, session_id: str, fields: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cards (cohort, session_id, fields, locked_at) VALUES (?, ?, ?, ?)",
+                (cohort, session_id, json.dumps(fields), time.time()),
+            )
+
+    def size(self, cohort: str) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cards WHERE cohort = ?", (cohort,)).fetchone()[0]
+
+    def cards(self, cohort: str) -> List[Tuple[str, dict]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id, fields FROM cards WHERE cohort = ? ORDER BY locked_at", (cohort,)
+            ).fetchall()
+        return [(session_id, json.loads(fields)) for session_id, fields in rows]
+
+
+_registries: SharedInstances[CardRegistry] = SharedInstances(CardRegistry)
+
+
+def get_registry(path: Optional[str] = None) -> CardRegistry:
+    return _registries.get(path or DEFAULT_REGISTRY_PATH)
+
+
+def register_card(cohort: str, session_id: str, fields: dict) -> None:
+    get_registry().register(cohort, session_id, fields)
+
+
+def cohort_size(cohort: str) -> int:
+    return get_registry().size(cohort)
+
+
+def build_cohort_archive(cohort: str, formats: Tuple[str, ...] = ("pdf", "png")) -> Tuple[bytes, List[str]]:
+    """A zip of every locked card in the cohort, and the sessions whose card failed to render.
+
+    Renders run in parallel on the card workers.
+    """
+    jobs = [(session_id, request_card(fields)) for session_id, fields in get_registry().cards(cohort)]
+    out = io.BytesIO()
+    failed = []
+    with zipfile.ZipFile(out, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, (session_id, (key, fut)) in enumerate(jobs, start=1):
+            try:
+                files = fut.result()
+            except Exception:
+                # One broken card shouldn't sink the export
+                failed.append(session_id)
+                continue
+            for fmt in formats:
+                zf.writestr(f"{cohort}/card-{i:03d}-{session_id[:8]}-{key[:8]}.{fmt}", files[fmt])
+    return out.getvalue(), failed
+
+
+def card_filename(fields: dict, fmt: str) -> str:
+    return f"strategy-card-{card_hash(fields)[:8]}.{fmt}"
@@ -0,0 +1,112 @@
+import time
+from typing import Dict, List, Optional
+
+from local_sqlite import SharedInstances, SQLiteFile, data_path
+
+# ------------------------------------------------------------
+# Token ledger and budget stages
+#
+# Every model response's usage is written to a local SQLite file, keyed by
+# session and cohort, so totals survive restarts and are shared by every
+# worker on the same host. Budgets degrade in stages as a cap gets close:
+#
+#   ok -> economy (smaller model) -> short (smaller model, trimmed context) -> stopped
+#
+# A session is limited by the tighter of its own cap and its cohort's cap.
+# ------------------------------------------------------------
+
+DEFAULT_LEDGER_PATH = data_path("token_ledger.sqlite3")
+
+BUDGET_OK = "ok"
+BUDGET_ECONOMY = "economy"
+BUDGET_SHORT = "short"
+BUDGET_STOPPED = "stopped"
+_STAGE_ORDER = [BUDGET_OK, BUDGET_ECONOMY, BUDGET_SHORT, BUDGET_STOPPED]
+
+ECONOMY_AT = 0.70
+SHORT_AT = 0.85
+
+
+def budget_stage(used: int, cap: Optional[int]) -> str:
+    if not cap:
+        return BUDGET_OK
+    ratio = used / cap
+    if ratio >= 1.0:
+        return BUDGET_STOPPED
+    if ratio >= SHORT_AT:
+        return BUDGET_SHORT
+    if ratio >= ECONOMY_AT:
+        return BUDGET_ECONOMY
+    return BUDGET_OK
+
+
+def worst_stage(*stages: str) -> str:
+    return max(stages, key=_STAGE_ORDER.index)
+
+
+class TokenLedger(SQLiteFile):
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH):
+        super().__init__(path)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts REAL NOT NULL,
+                    session_id TEXT NOT NULL,
+                    cohort TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    input_tokens INTEGER NOT NULL,
+                    output_tokens INTEGER NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS usage_session ON usage (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS usage_cohort ON usage (cohort)")
+
+    def record(self, session_id: str, cohort: str, model: str, input_tokens: int, output_tokens: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO usage (ts, session_id, cohort, model, input_tokens, output_tokens) VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), session_id, cohort, model, int(input_tokens or 0), int(output_tokens or 0)),
+            )
+
+    def session_total(self, session_id: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(input_tokens + output_tokens), 0) FROM usage WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return int(row[0])
+
+    def cohort_total(self, cohort: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(input_tokens + output_tokens), 0) FROM usage WHERE cohort = ?",
+                (cohort,),
+            ).fetchone()
+        return int(row[0])
+
+    def cohort_report(self, cohort: str) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """SELECT session_id, COUNT(*), SUM(input_tokens), SUM(output_tokens), MAX(ts)
+                   FROM usage WHERE cohort = ? GROUP BY session_id ORDER BY MAX(ts) DESC""",
+                (cohort,),
+            ).fetchall()
+        return [
+            {
+                "session": session_id[:8],
+                "calls": calls,
+                "input_tokens": inp,
+                "output_tokens": out,
+                "total": inp + out,
+                "last_used": time.strftime("%Y-%m-%d %H:%M", time.localtime(last)),
+            }
+            for session_id, calls, inp, out, last in rows
+        ]
+
+
+_ledgers: SharedInstances[TokenLedger] = SharedInstances(TokenLedger)
+
+
+def get_ledger(path: Optional[str] = None) -> TokenLedger:
+    return _ledgers.get(path or DEFAULT_LEDGER_PATH)
@@ -0,0 +1,227 @@
+import hashlib
+import html
+import json
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ------------------------------------------------------------
+# Visual aids panel assets
+#
+# Each aid is rendered once per variant (e.g. the value pyramid per
+# business_type) to an SVG under assets/visual_aids/, named by a hash of
+# its inputs, so a changed spec gets a new file and an unchanged one is
+# never re-rendered. After first use the SVG is served from memory for the
+# life of the process: no regeneration and no disk reads on rerun.
+#
+# Labels follow the system prompt's rule: use the thinking, not the
+# framework name.
+# ------------------------------------------------------------
+
+ASSET_VERSION = "2"
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "visual_aids")
+
+BRAND = "#003366"
+BRAND_MID = "#0B63B6"
+INK = "#0B1220"
+MUTED = "#5B6B7A"
+CARD = "#F4F7FB"
+BORDER = "#DDE5EF"
+
+VALUE_LEVELS = {
+    # Bottom to top
+    "b2c": ["Functional", "Emotional", "Life changing", "Social impact"],
+    "b2b": ["Table stakes", "Functional", "Ease of doing business", "Individual", "Inspirational"],
+}
+
+SWEET_SPOT_CIRCLES = ["What only you can offer", "What customers need", "Where competitors fall short"]
+
+EXAMPLE_STATEMENT = [
+    ("To grow to 17,000 financial advisers by 2012", "objective"),
+    (" by offering trusted and convenient face-to-face financial advice", "advantage"),
+    (" to conservative individual investors who delegate their financial decisions,", "scope"),
+    (" through a national network of one-financial-adviser offices.", "advantage"),
+]
+COMPONENT_COLOURS = {"objective": BRAND_MID, "scope": "#1B8A5A", "advantage": "#B5651D"}
+
+
+class VisualAid(NamedTuple):
+    name: str
+    variant: str
+    title: str
+    caption: str
+    svg: str
+    path: str
+
+
+# Which aid appears at which phase, and what it varies by
+PHASE_AIDS = {
+    "scope": "value_pyramid",
+    "advantage": "sweet_spot",
+    "strategy_statement": "example_statement",
+}
+
+_lock = threading.Lock()
+_memory: Dict[Tuple[str, str], VisualAid] = {}
+
+
+def _svg(width: int, height: int, body: str) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" font-family="Inter,sans-serif">{body}</svg>'
+    )
+
+
+def _render_value_pyramid(variant: str) -> str:
+    levels = VALUE_LEVELS[variant]
+    width, height, pad = 320, 40 + 44 * len(levels), 10
+    band = (height - 2 * pad) / len(levels)
+    parts = []
+    for i, label in enumerate(levels):
+        # i = 0 is the base (widest); draw from the bottom up
+        y_bottom = height - pad - i * band
+        y_top = y_bottom - band + 3
+        half_bottom = (width / 2 - pad) * (1 - i / len(levels))
+        half_top = (width / 2 - pad) * (1 - (i + 1) / len(levels))
+        cx = width / 2
+        shade = 0.35 + 0.65 * (i / max(1, len(levels) - 1))
+        points = (
+            f"{cx - half_bottom:.1f},{y_bottom:.1f} {cx + half_bottom:.1f},{y_bottom:.1f} "
+            f"{cx + half_top:.1f},{y_top:.1f} {cx - half_top:.1f},{y_top:.1f}"
+        )
+        parts.append(f'<polygon points="{points}" fill="{BRAND_MID}" fill-opacity="{shade:.2f}"/>')
+        parts.append(
+            f'<text x="{cx:.1f}" y="{(y_top + y_bottom) / 2 + 4:.1f}" text-anchor="middle" '
+            f'font-size="11" font-weight="600" fill="white">{html.escape(label)}</text>'
+        )
+    return _svg(width, height, "".join(parts))
+
+
+def _render_sweet_spot(_variant: str) -> str:
+    width, height, r = 320, 280, 78
+    centres = [(120, 105), (200, 105), (160, 175)]
+    colours = [BRAND_MID, "#1B8A5A", "#B5651D"]
+    label_pos = [(80, 60), (240, 60), (160, 268)]
+    parts = []
+    for (cx, cy), colour in zip(centres, colours):
+        parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{colour}" fill-opacity="0.18" stroke="{colour}"/>')
+    for (x, y), label in zip(label_pos, SWEET_SPOT_CIRCLES):
+        parts.append(
+            f'<text x="{x}" y="{y}" text-anchor="middle" font-size="10.5" font-weight="600" '
+            f'fill="{INK}">{html.escape(label)}</text>'
+        )
+    parts.append(
+        f'<text x="160" y="132" text-anchor="middle" font-size="11" font-weight="700" fill="{BRAND}">Sweet spot</text>'
+    )
+    return _svg(width, height, "".join(parts))
+
+
+def _wrap_segments(segments: List[Tuple[str, str]], width: int) -> List[List[Tuple[str, str]]]:
+    lines: List[List[Tuple[str, str]]] = [[]]
+    used = 0
+    for text, component in segments:
+        for word in text.split(" "):
+            if not word:
+                continue
+            piece = word if used == 0 else " " + word
+            if used + len(piece) > width and used > 0:
+                lines.append([])
+                used, piece = 0, word
+            lines[-1].append((piece, component))
+            used += len(piece)
+    return lines
+
+
+def _render_example_statement(_variant: str) -> str:
+    lines = _wrap_segments(EXAMPLE_STATEMENT, 46)
+    width, line_h, top = 340, 20, 28
+    height = top + line_h * len(lines) + 44
+    parts = [
+        f'<rect x="0" y="0" width="{width}" height="{height}" fill="{CARD}" stroke="{BORDER}"/>',
+        f'<text x="14" y="20" font-size="10" font-weight="700" fill="{MUTED}" letter-spacing="1">'
+        "A GOOD ONE: EDWARDS JONES</text>",
+    ]
+    for i, line in enumerate(lines):
+        spans = "".join(
+            f'<tspan fill="{COMPONENT_COLOURS[c]}">{html.escape(t)}</tspan>' for t, c in line
+        )
+        parts.append(f'<text x="14" y="{top + 14 + i * line_h}" font-size="12.5" font-weight="500" xml:space="preserve">{spans}</text>')
+    legend_y = top + line_h * len(lines) + 26
+    for j, (component, colour) in enumerate(COMPONENT_COLOURS.items()):
+        x = 14 + j * 105
+        parts.append(f'<rect x="{x}" y="{legend_y - 9}" width="10" height="10" fill="{colour}"/>')
+        parts.append(f'<text x="{x + 15}" y="{legend_y}" font-size="10.5" fill="{INK}">{component.title()}</text>')
+    return _svg(width, height, "".join(parts))
+
+
+_BUILDERS = {
+    "value_pyramid": (
+        _render_value_pyramid,
+        "What customers value",
+        "Which layers does your best customer pay for? The higher up, the harder you are to replace.",
+    ),
+    "sweet_spot": (
+        _render_sweet_spot,
+        "Where your advantage should sit",
+        "Something only you offer, that customers need, and that competitors don't or can't easily copy.",
+    ),
+    "example_statement": (
+        _render_example_statement,
+        "Objective, scope and advantage in one sentence",
+        "Colour shows which part of the statement does which job.",
+    ),
+}
+
+
+def _spec(name: str, variant: str) -> dict:
+    spec = {"asset_version": ASSET_VERSION, "name": name, "variant": variant}
+    if name == "value_pyramid":
+        spec["levels"] = VALUE_LEVELS[variant]
+    elif name == "sweet_spot":
+        spec["circles"] = SWEET_SPOT_CIRCLES
+    elif name == "example_statement":
+        spec["statement"] = EXAMPLE_STATEMENT
+    return spec
+
+
+def get_aid(name: str, variant: str = "default") -> VisualAid:
+    key = (name, variant)
+    aid = _memory.get(key)
+    if aid is not None:
+        return aid
+
+    with _lock:
+        aid = _memory.get(key)
+        if aid is not None:
+            return aid
+        render, title, caption = _BUILDERS[name]
+        digest = hashlib.sha256(json.dumps(_spec(name, variant), sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(ASSETS_DIR, f"{name}-{variant}-{digest}.svg")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                svg = f.read()
+        else:
+            svg = render(variant)
+            try:
+                os.makedirs(ASSETS_DIR, exist_ok=True)
+                tmp = f"{path}.tmp{os.getpid()}"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(svg)
+                os.replace(tmp, path)
+            except OSError:
+                # Read-only deploys still get the in-memory copy
+                pass
+        aid = VisualAid(name, variant, title, caption, svg, path)
+        _memory[key] = aid
+        return aid
+
+
+def aid_for_state(state: dict) -> Optional[VisualAid]:
+    """The aid for the current phase, loaded on first use. None before Scope."""
+    name = PHASE_AIDS.get(state.get("current_phase", ""))
+    if name is None:
+        return None
+    variant = "default"
+    if name == "value_pyramid":
+        variant = "b2b" if (state.get("business_type") or "").strip().lower() == "b2b" else "b2c"
+    return get_aid(name, variant)